@@ -1,8 +1,59 @@
-from ._generator import CaptchaGenerator
-from ._models import (
-    RGBModel, CaptchaModel, CaptchaCharModel, MathsCaptchaModel
-)
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
+if TYPE_CHECKING:
+    from ._generator import CaptchaGenerator
+    from ._fonts import FontCache, FontRegistry, get_font_registry
+    from ._atlas import GlyphAtlas
+    from ._palette import ContrastPalette
+    from ._layers import LayerCache
+    from ._buffers import BufferPool
+    from ._pool import CaptchaPool
+    from ._threaded import CaptchaThreadPool
+    from ._export import DatasetExporter
+    from ._store import CaptchaStore
+    from ._verifier import CaptchaVerifier
+    from ._async import AsyncCaptchaGenerator
+    from ._reservoir import CaptchaReservoir
+    from ._metrics import CaptchaMetrics
+    from ._random import NumpyRandom
+    from ._encoder import encode_image, encode_captcha, encode_math_captcha
+    from ._models import (
+        RGBModel, CaptchaModel, CaptchaCharModel, MathsCaptchaModel,
+        EncodedCaptchaModel, EncodedMathsCaptchaModel
+    )
+
+
+# Public names of the package and their modules, imported on first access
+# so short-lived workers only pay for the parts they use
+_LAZY_IMPORTS = {
+    "CaptchaGenerator": "._generator",
+    "FontCache": "._fonts",
+    "FontRegistry": "._fonts",
+    "get_font_registry": "._fonts",
+    "GlyphAtlas": "._atlas",
+    "ContrastPalette": "._palette",
+    "LayerCache": "._layers",
+    "BufferPool": "._buffers",
+    "CaptchaPool": "._pool",
+    "CaptchaThreadPool": "._threaded",
+    "DatasetExporter": "._export",
+    "CaptchaStore": "._store",
+    "CaptchaVerifier": "._verifier",
+    "AsyncCaptchaGenerator": "._async",
+    "CaptchaReservoir": "._reservoir",
+    "CaptchaMetrics": "._metrics",
+    "NumpyRandom": "._random",
+    "encode_image": "._encoder",
+    "encode_captcha": "._encoder",
+    "encode_math_captcha": "._encoder",
+    "RGBModel": "._models",
+    "CaptchaModel": "._models",
+    "CaptchaCharModel": "._models",
+    "MathsCaptchaModel": "._models",
+    "EncodedCaptchaModel": "._models",
+    "EncodedMathsCaptchaModel": "._models"
+}
 
 __version__ = "1.2.0"
 __description__ = "Python random image-captcha generator library."
@@ -14,8 +65,44 @@ __license__ = "GPLv3"
 
 __all__ = [
     "CaptchaGenerator",
+    "FontCache",
+    "FontRegistry",
+    "get_font_registry",
+    "GlyphAtlas",
+    "ContrastPalette",
+    "LayerCache",
+    "BufferPool",
+    "CaptchaPool",
+    "CaptchaThreadPool",
+    "DatasetExporter",
+    "CaptchaStore",
+    "CaptchaVerifier",
+    "AsyncCaptchaGenerator",
+    "CaptchaReservoir",
+    "CaptchaMetrics",
+    "NumpyRandom",
+    "encode_image",
+    "encode_captcha",
+    "encode_math_captcha",
     "RGBModel",
     "CaptchaModel",
     "CaptchaCharModel",
-    "MathsCaptchaModel"
+    "MathsCaptchaModel",
+    "EncodedCaptchaModel",
+    "EncodedMathsCaptchaModel"
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        )
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Optional
+
+from ._generator import CaptchaGenerator
+from ._models import CaptchaModel, MathsCaptchaModel
+from ._pool import _init_worker, _gen_batch
+from ._random import worker_rng
+
+
+class AsyncCaptchaGenerator:
+    def __init__(self, captcha_size_num: int = 2, executor: str = "thread",
+                 max_workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None,
+                 generator_kwargs: Optional[Dict[str, Any]] = None
+                 ) -> None:
+        """Captcha generator for asyncio applications, that runs the image
+        generation in a thread or process executor so the event loop is
+        never blocked.
+
+        Parameters
+        ----------
+        captcha_size_num : int, optional
+            by default 2
+        executor : str, optional
+            "thread" or "process", by default "thread"
+        max_workers : int, optional
+            number of executor workers, by default the executor default
+        max_concurrency : int, optional
+            max number of generations on the fly (the rest wait for their
+            turn), by default the number of workers
+        generator_kwargs : Dict[str, Any], optional
+            extra arguments for the CaptchaGenerator, by default None
+        """
+
+        executor = executor.lower()
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor}")
+        self.captcha_size_num = captcha_size_num
+        self.generator_kwargs = dict(generator_kwargs or {})
+        self._generator: Optional[CaptchaGenerator] = None
+        self._executor: Executor
+        if executor == "process":
+            # Fail early if the workers random sources can't be derived
+            worker_rng(self.generator_kwargs.get("rng"), 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers, initializer=_init_worker,
+                initargs=(captcha_size_num, self.generator_kwargs)
+            )
+            self._gen_func = _gen_batch
+        else:
+            # Executor threads share a single (thread-safe) generator
+            self._generator = CaptchaGenerator(
+                captcha_size_num, **self.generator_kwargs
+            )
+            self._executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="captcha"
+            )
+            self._gen_func = self._thread_gen_batch
+        if max_concurrency is None:
+            max_concurrency = getattr(self._executor, "_max_workers", 1)
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncCaptchaGenerator":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.close()
+
+    async def agen_captcha_image(self, **captcha_kwargs: Any
+                                 ) -> CaptchaModel:
+        """Generate an image captcha (gen_captcha_image() arguments are
+        accepted).
+
+        Returns
+        -------
+        CaptchaModel
+        """
+
+        return await self._run(False, captcha_kwargs)
+
+    async def agen_math_captcha_image(self, **captcha_kwargs: Any
+                                      ) -> MathsCaptchaModel:
+        """Generate a math image captcha (gen_math_captcha_image() arguments
+        are accepted).
+
+        Returns
+        -------
+        MathsCaptchaModel
+        """
+
+        return await self._run(True, captcha_kwargs)
+
+    async def _run(self, math: bool, captcha_kwargs: Dict[str, Any]) -> Any:
+        """Run a captcha generation in the executor, waiting if the max
+        number of concurrent generations is reached.
+
+        Parameters
+        ----------
+        math : bool
+        captcha_kwargs : Dict[str, Any]
+
+        Returns
+        -------
+        Any
+        """
+
+        # Semaphore is created here to bind it to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            captchas = await loop.run_in_executor(
+                self._executor,
+                partial(self._gen_func, math, 1, captcha_kwargs)
+            )
+        return captchas[0]
+
+    def _thread_gen_batch(self, math: bool, num_captchas: int,
+                          captcha_kwargs: Dict[str, Any]) -> Any:
+        """Generate a batch of captchas in an executor thread.
+
+        Parameters
+        ----------
+        math : bool
+        num_captchas : int
+        captcha_kwargs : Dict[str, Any]
+
+        Returns
+        -------
+        Any
+        """
+
+        generator: CaptchaGenerator = self._generator  # type: ignore
+        if math:
+            return generator.gen_math_captcha_batch(
+                num_captchas, **captcha_kwargs
+            )
+        return generator.gen_captcha_batch(num_captchas, **captcha_kwargs)
+
+    def close(self, wait: bool = True) -> None:
+        """Shutdown the executor.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            wait for the pending generations, by default True
+        """
+
+        self._executor.shutdown(wait=wait)
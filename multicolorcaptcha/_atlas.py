@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+from PIL import Image, ImageDraw
+from PIL.ImageFont import FreeTypeFont
+
+from ._constants import GLYPH_ATLAS_FONT_SIZES, GLYPH_ATLAS_MAX_BYTES
+
+
+# (alpha mask of the glyph, glyph offset from the text draw position)
+Glyph = Tuple[Optional[Image.Image], Tuple[int, int]]
+
+
+class GlyphAtlas:
+    def __init__(self, max_bytes: int = GLYPH_ATLAS_MAX_BYTES,
+                 font_sizes: int = GLYPH_ATLAS_FONT_SIZES) -> None:
+        """Memory of already rasterized characters glyphs (alpha masks),
+        keyed by font file path, font size and character. The least
+        recently used glyphs are discarded when the masks memory usage
+        exceeds the given limit (it is thread-safe). Font sizes are
+        quantized to a few sizes of each range, so the glyphs in use fit
+        in the atlas.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            by default GLYPH_ATLAS_MAX_BYTES
+        font_sizes : int, optional
+            font sizes used of each font size range,
+            by default GLYPH_ATLAS_FONT_SIZES
+        """
+
+        self.max_bytes = max_bytes
+        self.font_sizes = max(1, font_sizes)
+        self.memory_usage = 0
+        self._glyphs: "OrderedDict[Tuple[str, int, str], Glyph]" = \
+            OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._glyphs)
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of glyphs got from the atlas without rasterizing them."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def sizes_of(self, min_size: int, max_size: int) -> List[int]:
+        """Get the font sizes to use of a font size range (evenly spaced,
+        both limits included).
+
+        Parameters
+        ----------
+        min_size : int
+        max_size : int
+
+        Returns
+        -------
+        List[int]
+        """
+
+        if (self.font_sizes == 1) or (max_size <= min_size):
+            return [min_size]
+        step = (max_size - min_size) / (self.font_sizes - 1)
+        return sorted({
+            round(min_size + i * step) for i in range(0, self.font_sizes)
+        })
+
+    def get(self, character: str, font: FreeTypeFont) -> Glyph:
+        """Get the alpha mask and its draw offset of a character glyph,
+        rasterizing it if it is not already in the atlas.
+
+        Parameters
+        ----------
+        character : str
+        font : FreeTypeFont
+
+        Returns
+        -------
+        Glyph
+        """
+
+        key = (str(font.path), int(font.size), character)
+        with self._lock:
+            glyph = self._glyphs.get(key)
+            if glyph is not None:
+                self.hits += 1
+                self._glyphs.move_to_end(key)
+                return glyph
+            self.misses += 1
+        # Rasterize out of the lock to not block other threads
+        glyph = self.rasterize(character, font)
+        with self._lock:
+            if key in self._glyphs:
+                return self._glyphs[key]
+            self._glyphs[key] = glyph
+            self.memory_usage += self.glyph_bytes(glyph)
+            # Discard least recently used glyphs if memory limit is reached
+            while (self.memory_usage > self.max_bytes) and \
+                    (len(self._glyphs) > 1):
+                _, old_glyph = self._glyphs.popitem(last=False)
+                self.memory_usage -= self.glyph_bytes(old_glyph)
+        return glyph
+
+    def rasterize(self, character: str, font: FreeTypeFont) -> Glyph:
+        """Render a character glyph into an alpha mask that just fit it.
+
+        Parameters
+        ----------
+        character : str
+        font : FreeTypeFont
+
+        Returns
+        -------
+        Glyph
+        """
+
+        left, top, right, bottom = font.getbbox(character)
+        width = int(right - left)
+        height = int(bottom - top)
+        if (width <= 0) or (height <= 0):
+            return (None, (0, 0))
+        mask = Image.new("L", (width, height), 0)
+        draw = ImageDraw.Draw(mask)
+        draw.text((-left, -top), character, fill=255, font=font)
+        return (mask, (int(left), int(top)))
+
+    @staticmethod
+    def glyph_bytes(glyph: Glyph) -> int:
+        """Memory used by a glyph mask.
+
+        Parameters
+        ----------
+        glyph : Glyph
+
+        Returns
+        -------
+        int
+        """
+
+        mask = glyph[0]
+        if mask is None:
+            return 0
+        return mask.width * mask.height
+
+    def clear(self) -> None:
+        """Remove all glyphs from the atlas."""
+
+        with self._lock:
+            self._glyphs.clear()
+            self.memory_usage = 0
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from threading import local
+from typing import Any, Dict, List, Tuple
+from PIL import Image
+
+from ._constants import BUFFER_POOL_MAX_IMAGES
+
+
+# (image mode, image size)
+BufferKey = Tuple[str, Tuple[int, int]]
+
+
+class BufferPool:
+    def __init__(self, max_images: int = BUFFER_POOL_MAX_IMAGES) -> None:
+        """Pool of released images that are recycled for next images of the
+        same mode and size, instead of allocating new ones. Each thread
+        has its own pool (so no locking is needed), and images released by
+        a thread are reused by that thread.
+
+        Parameters
+        ----------
+        max_images : int, optional
+            max images kept for each (mode, size) (0 just counts the
+            allocations), by default BUFFER_POOL_MAX_IMAGES
+        """
+
+        self.max_images = max(0, max_images)
+        self.allocations = 0
+        self.reuses = 0
+        self._local = local()
+
+    def acquire(self, mode: str, size: Tuple[int, int],
+                color: Any = 0) -> Image.Image:
+        """Get an image filled with a color, recycling a released one if
+        available.
+
+        Parameters
+        ----------
+        mode : str
+        size : Tuple[int, int]
+        color : Any, optional
+            by default 0 (black)
+
+        Returns
+        -------
+        Image.Image
+        """
+
+        images = self._images().get((mode, size))
+        if images:
+            self.reuses += 1
+            image = images.pop()
+            image.paste(color, (0, 0) + size)
+            return image
+        self.allocations += 1
+        return Image.new(mode, size, color)
+
+    def release(self, image: Image.Image) -> None:
+        """Give back an image to be recycled (it must not be used anymore).
+
+        Parameters
+        ----------
+        image : Image.Image
+        """
+
+        images = self._images().setdefault((image.mode, image.size), [])
+        if len(images) < self.max_images:
+            images.append(image)
+
+    def pooled(self) -> int:
+        """Get the number of images waiting to be recycled by the current
+        thread.
+
+        Returns
+        -------
+        int
+        """
+
+        return sum(len(images) for images in self._images().values())
+
+    def clear(self) -> None:
+        """Remove the images of the current thread pool."""
+
+        self._images().clear()
+
+    def _images(self) -> Dict[BufferKey, List[Image.Image]]:
+        images = getattr(self._local, "images", None)
+        if images is None:
+            images = {}
+            self._local.images = images
+        return images
@@ -4,9 +4,95 @@ from os import path
 SCRIPT_PATH = path.dirname(path.realpath(__file__))
 FONTS_PATH = SCRIPT_PATH + "/fonts"
 
-# Captcha with noise (turn it on add delay)
+# Fonts registry index file to avoid fonts discovery and checks on each run
+# (None to disable)
+FONTS_INDEX_FILE = None
+
+# Font size used to check fonts files
+FONT_CHECK_SIZE = 24
+
+# Fonts tags for fonts that support all the characters of each group
+FONT_COVERAGE_TAGS = {
+    "digits": "0123456789",
+    "hex": "ABCDEF0123456789",
+    "ascii": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+    "symbols": "+-x"
+}
+
+# Font to use when a font file can't be loaded
+FALLBACK_FONT = "arial.ttf"
+
+# Min number of (font file, font size) loaded fonts to keep in memory
+# (generators grow it to all their fonts and font sizes by default)
+FONT_CACHE_SIZE = 512
+
+# Max memory (bytes) of rasterized glyphs masks to keep in the glyph atlas
+# (it fits all the characters of any chars mode for captcha sizes up to 8,
+# and of "nums" and "hex" modes for any captcha size)
+GLYPH_ATLAS_MAX_BYTES = 128 * 1024 * 1024
+
+# Number of font sizes (evenly spaced in the font size range) used when the
+# glyph atlas is enabled, so all the glyphs in use fit in the atlas
+GLYPH_ATLAS_FONT_SIZES = 6
+
+# Captcha with noise by default (it can be set on each generation call)
 ADD_NOISE = False
 
+# Number of noise pixels to add to each one-char image
+NOISE_PIXELS = 200
+
+# Default encoders settings (fast PNG zlib level, WebP/JPEG quality and
+# WebP encoding method speed from 0 fast to 6 slow)
+PNG_COMPRESS_LEVEL = 1
+LOSSY_QUALITY = 80
+WEBP_METHOD = 0
+
+# Generation stages duration histogram buckets (seconds)
+METRICS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Number of random values drawn at once from numpy random generators
+RNG_BUFFER_SIZE = 4096
+
+# Min noise pixels of an image to import numpy for writing them in one go
+# (importing it takes longer than writing fewer pixels one by one)
+NUMPY_NOISE_MIN_PIXELS = 25000
+
+# Released images kept by each thread buffer pool for each (mode, size)
+BUFFER_POOL_MAX_IMAGES = 4
+
+# Decoy layers of each captcha size and difficult level in the layer cache
+LAYER_CACHE_LAYERS = 8
+
+# Probability of re-rendering a cached decoy layer each time it is used
+LAYER_CACHE_REFRESH_RATE = 0.05
+
+# Max random offset of the cached decoy layers (relative to the captcha size)
+LAYER_CACHE_MAX_OFFSET = 0.1
+
+# Min WCAG contrast ratio between characters and background colors
+# (3:1 is the WCAG AA level for large text)
+CONTRAST_MIN_RATIO = 3.0
+
+# Number of background luminance ranges of the contrast color tables
+CONTRAST_BUCKETS = 64
+
+# Values of each RGB channel in the contrast colors palette (6 -> 216 colors)
+CONTRAST_PALETTE_LEVELS = 6
+
+# Seconds to expire a not verified captcha answer
+VERIFIER_TTL = 300.0
+
+# Random bytes of the captcha IDs generated by the verifier
+VERIFIER_ID_BYTES = 16
+
+# Max size of the captcha server requests body, in bytes
+SERVE_MAX_BODY = 4096
+
+# Cold start budget (import, generator creation and first encoded captcha
+# in a new process), in milliseconds
+STARTUP_BUDGET_MS = 200.0
+
 # Captcha 16:9 resolution sizes (captcha_size_num -> 0 to 12)
 CAPTCHA_SIZE = [(256, 144), (426, 240), (640, 360), (768, 432),
                 (800, 450), (848, 480), (960, 540), (1024, 576), (1152, 648),
@@ -18,6 +104,13 @@ FONT_SIZE_RANGE = [(30, 45), (35, 80), (75, 125), (80, 140),
                    (110, 185), (125, 195), (135, 210),
                    (150, 230), (165, 250), (180, 290)]
 
+# Available characters for each captcha chars mode
+CHARS_MODES = {
+    "nums": "0123456789",
+    "hex": "ABCDEF0123456789",
+    "ascii": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+}
+
 # Difficult levels captcha generation values
 # (<lines in full img>, <circles in full img>)
 DIFFICULT_LEVELS_VALUES = [(0, 0), (1, 10), (2, 17), (3, 25), (4, 50), (5, 70)]
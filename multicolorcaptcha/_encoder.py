@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+from io import BytesIO
+from typing import Any, Dict, Optional
+from PIL import Image
+
+from ._constants import PNG_COMPRESS_LEVEL, LOSSY_QUALITY, WEBP_METHOD
+from ._models import (
+    CaptchaModel, MathsCaptchaModel,
+    EncodedCaptchaModel, EncodedMathsCaptchaModel
+)
+
+
+# Supported image file formats (and their aliases)
+IMAGE_FORMATS = {"png": "png", "webp": "webp", "jpeg": "jpeg", "jpg": "jpeg"}
+
+
+def normalize_image_format(image_format: str) -> str:
+    """Get the canonical name of a supported image file format ("png",
+    "webp" or "jpeg").
+
+    Parameters
+    ----------
+    image_format : str
+        image file format name (any case, "jpg" for "jpeg")
+
+    Returns
+    -------
+    str
+
+    Raises
+    ------
+    ValueError
+        if the image format is not supported
+    """
+
+    normalized = IMAGE_FORMATS.get(image_format.lower())
+    if normalized is None:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return normalized
+
+
+def encode_image(image: Image.Image, image_format: str = "png",
+                 compress_level: Optional[int] = None,
+                 quality: Optional[int] = None,
+                 quantize: Optional[int] = None) -> bytes:
+    """Encode a PIL image into the bytes of the given image file format
+    ("png", "webp" or "jpeg"), using fast encoder settings by default.
+
+    Parameters
+    ----------
+    image : Image.Image
+    image_format : str, optional
+        by default "png"
+    compress_level : int, optional
+        PNG zlib compression level (0-9), by default PNG_COMPRESS_LEVEL
+    quality : int, optional
+        WebP and JPEG quality (0-100), by default LOSSY_QUALITY
+    quantize : int, optional
+        reduce the image to a palette of this number of colors (PNG only,
+        it makes WebP files bigger), by default None (no quantization)
+
+    Returns
+    -------
+    bytes
+
+    Raises
+    ------
+    ValueError
+        if the image format is not supported
+    """
+
+    image_format = normalize_image_format(image_format)
+    if quality is None:
+        quality = LOSSY_QUALITY
+    options: Dict[str, Any] = {}
+    if image_format == "png":
+        if compress_level is None:
+            compress_level = PNG_COMPRESS_LEVEL
+        options["compress_level"] = compress_level
+    elif image_format == "webp":
+        options["quality"] = quality
+        options["method"] = WEBP_METHOD
+    elif image_format == "jpeg":
+        options["quality"] = quality
+        # JPEG doesn't support alpha channel
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+    if quantize and (image_format == "png"):
+        image = image.quantize(quantize, Image.Quantize.FASTOCTREE)
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def encode_captcha(captcha: CaptchaModel, image_format: str = "png",
+                   **encode_options: Any) -> EncodedCaptchaModel:
+    """Encode the image of a captcha (encode_image() options are
+    accepted).
+
+    Parameters
+    ----------
+    captcha : CaptchaModel
+    image_format : str, optional
+        by default "png"
+
+    Returns
+    -------
+    EncodedCaptchaModel
+    """
+
+    image_format = normalize_image_format(image_format)
+    return EncodedCaptchaModel(
+        data=encode_image(captcha.image, image_format, **encode_options),
+        image_format=image_format,
+        characters=captcha.characters
+    )
+
+
+def encode_math_captcha(captcha: MathsCaptchaModel,
+                        image_format: str = "png", **encode_options: Any
+                        ) -> EncodedMathsCaptchaModel:
+    """Encode the image of a math captcha (encode_image() options are
+    accepted).
+
+    Parameters
+    ----------
+    captcha : MathsCaptchaModel
+    image_format : str, optional
+        by default "png"
+
+    Returns
+    -------
+    EncodedMathsCaptchaModel
+    """
+
+    image_format = normalize_image_format(image_format)
+    return EncodedMathsCaptchaModel(
+        data=encode_image(captcha.image, image_format, **encode_options),
+        image_format=image_format,
+        equation_str=captcha.equation_str,
+        equation_result=captcha.equation_result
+    )
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import json
+import tarfile
+from io import BytesIO
+from os import makedirs, path, replace
+from time import time
+from typing import Any, Iterator, List, Optional, Union
+
+from ._models import EncodedModel, captcha_label
+from ._pool import CaptchaPool
+from ._threaded import CaptchaThreadPool
+
+
+class DatasetExporter:
+    def __init__(self, output_dir: str, shard_size: int = 10000,
+                 prefix: str = "captchas",
+                 pool: Optional[Union[CaptchaPool, CaptchaThreadPool]] = None,
+                 captcha_size_num: int = 2,
+                 processes: Optional[int] = None) -> None:
+        """Exporter of labelled captcha datasets into tar archive shards.
+        Each captcha is stored as an image file and a JSON label file
+        sharing the same name (the sample index), with the captchas
+        generated in parallel and streamed to the archives, so memory usage
+        doesn't depend on the dataset size.
+
+        Parameters
+        ----------
+        output_dir : str
+        shard_size : int, optional
+            captchas on each archive, by default 10000
+        prefix : str, optional
+            archive files name prefix, by default "captchas"
+        pool : CaptchaPool | CaptchaThreadPool, optional
+            pool that generates the captchas (its image format is used),
+            by default a new CaptchaPool for each export
+        captcha_size_num : int, optional
+            captcha size of the default pool, by default 2
+        processes : int, optional
+            processes of the default pool, by default the number of CPUs
+        """
+
+        self.output_dir = output_dir
+        self.shard_size = max(1, shard_size)
+        self.prefix = prefix
+        self.pool = pool
+        self.captcha_size_num = captcha_size_num
+        self.processes = processes
+
+    def export(self, num_captchas: int, math: bool = False,
+               first_index: int = 0, **captcha_kwargs: Any) -> List[str]:
+        """Generate and export captchas (gen_captcha_image() or
+        gen_math_captcha_image() arguments are accepted).
+
+        Parameters
+        ----------
+        num_captchas : int
+        math : bool, optional
+            export math captchas, by default False
+        first_index : int, optional
+            index of the first sample, to append to a previous export (its
+            number of captchas), by default 0
+
+        Returns
+        -------
+        List[str]
+            written archive files
+        """
+
+        makedirs(self.output_dir, exist_ok=True)
+        pool = self.pool
+        if pool is None:
+            pool = CaptchaPool(self.captcha_size_num, self.processes)
+        try:
+            if math:
+                captchas: Iterator[EncodedModel] = pool.imap_math_captchas(
+                    num_captchas, **captcha_kwargs
+                )
+            else:
+                captchas = pool.imap_captchas(num_captchas, **captcha_kwargs)
+            return self.write_shards(captchas, first_index)
+        finally:
+            if self.pool is None:
+                pool.close()
+
+    def write_shards(self, captchas: Iterator[EncodedModel],
+                     first_index: int = 0) -> List[str]:
+        """Write encoded captchas into archive shards. Each archive is
+        written to a temporary file that is renamed when it is complete.
+
+        Parameters
+        ----------
+        captchas : Iterator[EncodedModel]
+        first_index : int, optional
+            by default 0
+
+        Returns
+        -------
+        List[str]
+            written archive files
+        """
+
+        shards: List[str] = []
+        archive: Optional[tarfile.TarFile] = None
+        shard_file = ""
+        # Start after the shards of any previous export
+        shard_num = -(-first_index // self.shard_size)
+        shard_captchas = 0
+        index = first_index
+        try:
+            for captcha in captchas:
+                if archive is None:
+                    shard_file = self.shard_file(shard_num)
+                    archive = tarfile.open(shard_file + ".tmp", "w")
+                name = f"{index:09d}"
+                self._add_member(
+                    archive, f"{name}.{captcha.image_format}", captcha.data
+                )
+                self._add_member(
+                    archive, f"{name}.json",
+                    json.dumps(captcha_label(captcha)).encode()
+                )
+                index += 1
+                shard_captchas += 1
+                if shard_captchas == self.shard_size:
+                    archive.close()
+                    archive = None
+                    shard_num += 1
+                    shard_captchas = 0
+                    replace(shard_file + ".tmp", shard_file)
+                    shards.append(shard_file)
+            if archive is not None:
+                archive.close()
+                archive = None
+                replace(shard_file + ".tmp", shard_file)
+                shards.append(shard_file)
+        finally:
+            if archive is not None:
+                archive.close()
+        return shards
+
+    def shard_file(self, shard_num: int) -> str:
+        """Get the archive file path of a shard.
+
+        Parameters
+        ----------
+        shard_num : int
+
+        Returns
+        -------
+        str
+        """
+
+        return path.join(
+            self.output_dir, f"{self.prefix}-{shard_num:06d}.tar"
+        )
+
+    @staticmethod
+    def _add_member(archive: tarfile.TarFile, name: str,
+                    data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time())
+        archive.addfile(info, BytesIO(data))
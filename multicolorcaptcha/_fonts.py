@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+import json
+from collections import OrderedDict
+from os import path, replace, stat, walk
+from threading import Lock, RLock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from PIL import ImageFont
+from PIL.ImageFont import FreeTypeFont
+
+from ._constants import (
+    FALLBACK_FONT, FONT_CACHE_SIZE, FONTS_PATH, FONTS_INDEX_FILE,
+    FONT_CHECK_SIZE, FONT_COVERAGE_TAGS
+)
+
+
+class FontCache:
+    def __init__(self, max_size: int = FONT_CACHE_SIZE) -> None:
+        """Least recently used cache of loaded FreeType font objects, keyed
+        by font file path and font size (it is thread-safe).
+
+        Parameters
+        ----------
+        max_size : int, optional
+            by default FONT_CACHE_SIZE
+        """
+
+        self.max_size = max(1, max_size)
+        self._fonts: "OrderedDict[Tuple[str, int], FreeTypeFont]" = \
+            OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def get(self, font_path: str, font_size: int) -> FreeTypeFont:
+        """Get the font object of the given file path and size, loading it
+        from disk if it is not already cached.
+
+        Parameters
+        ----------
+        font_path : str
+        font_size : int
+
+        Returns
+        -------
+        FreeTypeFont
+        """
+
+        key = (font_path, font_size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self.hits += 1
+                self._fonts.move_to_end(key)
+                return font
+            self.misses += 1
+        # Load the font out of the lock to not block other threads
+        font = self.load(font_path, font_size)
+        with self._lock:
+            font = self._fonts.setdefault(key, font)
+            # Evict least recently used fonts if the cache is full
+            while len(self._fonts) > self.max_size:
+                self._fonts.popitem(last=False)
+        return font
+
+    def load(self, font_path: str, font_size: int) -> FreeTypeFont:
+        """Load a font object from disk (no caching).
+
+        Parameters
+        ----------
+        font_path : str
+        font_size : int
+
+        Returns
+        -------
+        FreeTypeFont
+        """
+
+        try:
+            font = ImageFont.truetype(font_path, font_size)
+        except OSError:
+            print("Incompatible font for captcha. Using standard arial.ttf")
+            font = ImageFont.truetype(FALLBACK_FONT, font_size)
+        return font
+
+    def preload(self, fonts_list: Iterable[str],
+                size_range: Tuple[int, int]) -> None:
+        """Load all the provided fonts for each size of the given range
+        (both limits included). The cache is grown if needed to keep all
+        of them.
+
+        Parameters
+        ----------
+        fonts_list : Iterable[str]
+        size_range : Tuple[int, int]
+        """
+
+        fonts_list = list(fonts_list)
+        num_sizes = size_range[1] - size_range[0] + 1
+        self.max_size = max(self.max_size, len(fonts_list) * num_sizes)
+        for font_path in fonts_list:
+            for font_size in range(size_range[0], size_range[1] + 1):
+                self.get(font_path, font_size)
+
+    def clear(self) -> None:
+        """Remove all cached fonts."""
+
+        with self._lock:
+            self._fonts.clear()
+
+
+class FontRegistry:
+    def __init__(self, fonts_path: str = FONTS_PATH,
+                 index_file: Optional[str] = None) -> None:
+        """Index of the available (and loadable) font files of a fonts
+        directory. Fonts are discovered and validated lazily, just the
+        first time they are requested, and they can be filtered by tag.
+
+        Glyph coverage tags ("digits", "hex", "ascii" and "symbols") are
+        computed on first use, and custom tags can be added. If an index
+        file is provided, the fonts and their tags are stored there to
+        avoid the directory walk and font checks on next runs.
+
+        Parameters
+        ----------
+        fonts_path : str, optional
+            by default FONTS_PATH
+        index_file : str, optional
+            by default None (no persistent index)
+        """
+
+        self.fonts_path = fonts_path
+        self.index_file = index_file
+        self._fonts: Optional[Dict[str, Set[str]]] = None
+        self._coverage_tags = False
+        self._lock = RLock()
+
+    def get_fonts(self, tag: Optional[str] = None) -> List[str]:
+        """Get the paths of the valid fonts files, optionally just the ones
+        with the given tag.
+
+        Parameters
+        ----------
+        tag : str, optional
+            by default None
+
+        Returns
+        -------
+        List[str]
+        """
+
+        fonts = self._load()
+        if tag is None:
+            return list(fonts)
+        if (tag in FONT_COVERAGE_TAGS) and (not self._coverage_tags):
+            self._add_coverage_tags()
+        return [font for font, tags in fonts.items() if tag in tags]
+
+    def get_tags(self, font_path: str) -> Set[str]:
+        """Get the tags of a font file.
+
+        Parameters
+        ----------
+        font_path : str
+
+        Returns
+        -------
+        Set[str]
+        """
+
+        fonts = self._load()
+        if not self._coverage_tags:
+            self._add_coverage_tags()
+        return set(fonts.get(font_path, ()))
+
+    def add_tag(self, tag: str, fonts_paths: Iterable[str]) -> None:
+        """Add a custom tag to the given fonts files (for example,
+        "readable").
+
+        Parameters
+        ----------
+        tag : str
+        fonts_paths : Iterable[str]
+        """
+
+        fonts = self._load()
+        with self._lock:
+            for font_path in fonts_paths:
+                if font_path in fonts:
+                    fonts[font_path].add(tag)
+
+    def refresh(self) -> None:
+        """Discard the current fonts index and discover the fonts again."""
+
+        with self._lock:
+            self._fonts = None
+            self._coverage_tags = False
+            self._discover()
+
+    def _load(self) -> Dict[str, Set[str]]:
+        """Get the fonts index, building it if it is the first use.
+
+        Returns
+        -------
+        Dict[str, Set[str]]
+        """
+
+        fonts = self._fonts
+        if fonts is not None:
+            return fonts
+        with self._lock:
+            if self._fonts is None:
+                if not self._read_index():
+                    self._discover()
+                    # Build the full index to save it
+                    if self.index_file is not None:
+                        self._add_coverage_tags()
+            return self._fonts  # type: ignore
+
+    def _discover(self) -> None:
+        """Get available and loadable fonts files recursively from fonts
+        directories."""
+
+        fonts: Dict[str, Set[str]] = {}
+        for root, _, files in walk(self.fonts_path, topdown=True):
+            for file in sorted(files):
+                _, f_ext = path.splitext(file)
+                if f_ext != ".ttf":
+                    continue
+                font_path = path.join(root, file)
+                try:
+                    ImageFont.truetype(font_path, FONT_CHECK_SIZE)
+                except OSError:
+                    print(f"Incompatible font for captcha: {font_path}")
+                    continue
+                fonts[font_path] = set()
+        self._fonts = fonts
+
+    def _add_coverage_tags(self) -> None:
+        """Check the characters supported by each font to tag them, and save
+        the fonts index file."""
+
+        with self._lock:
+            if self._coverage_tags:
+                return
+            for font_path, tags in self._load().items():
+                font = ImageFont.truetype(font_path, FONT_CHECK_SIZE)
+                missing = self._glyph_mask(font, "\U0010FFFD")
+                for tag, characters in FONT_COVERAGE_TAGS.items():
+                    if all(self._glyph_mask(font, c) != missing
+                           for c in characters):
+                        tags.add(tag)
+            self._coverage_tags = True
+            self._write_index()
+
+    @staticmethod
+    def _glyph_mask(font: FreeTypeFont, character: str) -> Tuple[Any, ...]:
+        mask = font.getmask(character)
+        return (mask.size, bytes(mask))
+
+    def _read_index(self) -> bool:
+        """Load the fonts from the index file if it is still valid (all
+        fonts files exist and are unchanged).
+
+        Returns
+        -------
+        bool
+        """
+
+        if (self.index_file is None) or (not path.exists(self.index_file)):
+            return False
+        try:
+            with open(self.index_file, "r") as f:
+                index = json.load(f)
+            if index.get("fonts_path") != self.fonts_path:
+                return False
+            fonts: Dict[str, Set[str]] = {}
+            for font_path, info in index["fonts"].items():
+                stat_info = stat(font_path)
+                if [stat_info.st_size, stat_info.st_mtime] != info["stat"]:
+                    return False
+                fonts[font_path] = set(info["tags"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._fonts = fonts
+        self._coverage_tags = True
+        return True
+
+    def _write_index(self) -> None:
+        """Save the fonts and their tags in the index file (if any)."""
+
+        if (self.index_file is None) or (self._fonts is None):
+            return
+        fonts = {}
+        for font_path, tags in self._fonts.items():
+            stat_info = stat(font_path)
+            fonts[font_path] = {
+                "stat": [stat_info.st_size, stat_info.st_mtime],
+                "tags": sorted(tags)
+            }
+        index = {"fonts_path": self.fonts_path, "fonts": fonts}
+        try:
+            tmp_file = self.index_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(index, f)
+            replace(tmp_file, self.index_file)
+        except OSError as error:
+            print(f"Can't save fonts index file: {error}")
+
+
+# Process-wide default fonts registry
+_default_registry: Optional[FontRegistry] = None
+_default_registry_lock = Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """Get the process-wide fonts registry of the library fonts directory
+    (it is created on first use).
+
+    Returns
+    -------
+    FontRegistry
+    """
+
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = FontRegistry(
+                    FONTS_PATH, FONTS_INDEX_FILE
+                )
+    return _default_registry
@@ -1,30 +1,108 @@
 # -*- coding: utf-8 -*-
 
-from os import path, walk
-from random import randint, choice
-from typing import Any, List, Tuple, Union
-from PIL import Image, ImageFont, ImageDraw
+from threading import local
+from typing import Any, List, Optional, Tuple, Union
+from PIL import Image, ImageDraw
 from PIL.ImageFont import FreeTypeFont
 
+from ._atlas import GlyphAtlas
+from ._buffers import BufferPool
+from ._encoder import encode_captcha, encode_math_captcha
+from ._fonts import FontCache, FontRegistry, get_font_registry
+from ._layers import LayerCache
+from ._metrics import stage_timer
+from ._palette import ContrastPalette, get_contrast_palette
+from ._random import NumpyRandom, bulk_numpy, import_numpy, make_rng
 from ._models import (
-    RGBModel, CaptchaModel, CaptchaCharModel, MathsCaptchaModel
+    RGBModel, CaptchaModel, CaptchaCharModel, MathsCaptchaModel,
+    EncodedCaptchaModel, EncodedMathsCaptchaModel
 )
 from ._constants import (
-    FONTS_PATH, ADD_NOISE, CAPTCHA_SIZE,
-    FONT_SIZE_RANGE, DIFFICULT_LEVELS_VALUES
+    ADD_NOISE, NOISE_PIXELS, CAPTCHA_SIZE,
+    FONT_SIZE_RANGE, DIFFICULT_LEVELS_VALUES, FONT_CACHE_SIZE,
+    GLYPH_ATLAS_MAX_BYTES, CHARS_MODES, CONTRAST_MIN_RATIO
 )
 
 
+# Image region (left, top, right, bottom)
+Box = Tuple[int, int, int, int]
+
+# Pillow color (RGB tuple, color string or single band value)
+Color = Union[Tuple[int, int, int], str, int]
+
+
 class CaptchaGenerator:
-    def __init__(self, captcha_size_num: int = 2) -> None:
-        """Just and image captcha generator class.
+    def __init__(self, captcha_size_num: int = 2,
+                 font_cache_size: Optional[int] = None,
+                 preload_fonts: bool = False, glyph_atlas: bool = False,
+                 glyph_atlas_max_bytes: int = GLYPH_ATLAS_MAX_BYTES,
+                 metrics: Any = None,
+                 font_registry: Optional[FontRegistry] = None,
+                 font_tag: Optional[str] = None, rng: Any = None,
+                 contrast_ratio: float = CONTRAST_MIN_RATIO,
+                 layer_cache: Optional[LayerCache] = None,
+                 buffer_pool: bool = False) -> None:
+        """Just and image captcha generator class (generation functions
+        don't modify the generator state, so a single instance can be
+        shared by multiple threads).
 
         Parameters
         ----------
         captcha_size_num : int, optional
             by default 2
+        font_cache_size : int, optional
+            max number of loaded (font, size) fonts to keep in memory,
+            by default None (all the fonts for all the font sizes of the
+            captcha size, so the cache doesn't evict fonts in use)
+        preload_fonts : bool, optional
+            load all fonts for all the font sizes of the captcha size at
+            construction time, by default False
+        glyph_atlas : bool, optional
+            rasterize each (font, size, character) glyph just once and
+            reuse it for next captchas (just GLYPH_ATLAS_FONT_SIZES font
+            sizes of the range are used), by default False
+        glyph_atlas_max_bytes : int, optional
+            max memory of the glyph atlas masks,
+            by default GLYPH_ATLAS_MAX_BYTES
+        metrics : Any, optional
+            metrics sink (CaptchaMetrics or any object with an
+            observe(stage, seconds) method) to report generation stages
+            timings, by default None (disabled)
+        font_registry : FontRegistry, optional
+            registry to get the fonts from, by default the process-wide
+            registry of the library fonts
+        font_tag : str, optional
+            use just the fonts with this tag (i.e. "ascii"),
+            by default None (all valid fonts)
+        rng : Any, optional
+            random numbers source: an int seed, a random.Random instance, a
+            numpy Generator (values are drawn in bulk) or any object with
+            the random module randint(), choice(), choices() and random()
+            functions, by default None (random module global generator)
+        contrast_ratio : float, optional
+            min WCAG contrast ratio between characters and background
+            colors, by default CONTRAST_MIN_RATIO
+        layer_cache : LayerCache, optional
+            composite pre-rendered decoy lines and circles layers from this
+            cache instead of drawing them for each captcha, by default None
+        buffer_pool : bool, optional
+            recycle the characters and captcha images buffers instead of
+            allocating new ones (release() gives back the captchas
+            images), by default False
         """
 
+        # Random numbers source (and numpy Generators derived from it for
+        # bulk draws, one for each thread)
+        self.rng = make_rng(rng)
+        self._numpy_rngs = local()
+
+        # Generation stages metrics sink
+        self.metrics = metrics
+
+        # Min contrast of the characters colors (their precomputed palette
+        # is built on first use)
+        self.contrast_ratio = contrast_ratio
+
         # Limit provided captcha size num
         if captcha_size_num < 0:
             captcha_size_num = 0
@@ -34,26 +112,184 @@ class CaptchaGenerator:
         # Get captcha size
         self.captcha_size = CAPTCHA_SIZE[captcha_size_num]
 
-        # Determine one char image height
-        fourth_size = self.captcha_size[0] / 4
-        if fourth_size - int(fourth_size) <= 0.5:
-            fourth_size = int(fourth_size)
-        else:
-            fourth_size = int(fourth_size) + 1
-        self.one_char_image_size = (fourth_size, fourth_size)
+        # Determine one char image size of captchas (4 chars) and math
+        # captchas (5 chars), they don't change after construction, so
+        # the generator can be used from multiple threads at once
+        self.one_char_image_sizes = {
+            4: self.one_char_size(4),
+            5: self.one_char_size(5)
+        }
+        self.one_char_image_size = self.one_char_image_sizes[4]
 
         # Determine font size according to image size
         font_size_min = FONT_SIZE_RANGE[captcha_size_num][0]
         font_size_max = FONT_SIZE_RANGE[captcha_size_num][1]
         self.font_size_range = (font_size_min, font_size_max)
 
-        # Get available Fonts files recursively from fonts directories
-        self.l_fonts = []
-        for root, _, files in walk(FONTS_PATH, topdown=True):
-            for file in files:
-                _, f_ext = path.splitext(file)
-                if f_ext == ".ttf":
-                    self.l_fonts.append(path.join(root, file))
+        # Fonts registry to get the fonts files from (they are discovered
+        # on first use, to not slow down the generator creation)
+        if font_registry is None:
+            font_registry = get_font_registry()
+        self.font_registry = font_registry
+        self.font_tag = font_tag
+        self._l_fonts: Optional[List[str]] = None
+
+        # Loaded fonts cache (sized to the fonts in use when they are
+        # discovered, if no size is provided)
+        self.font_cache_autosize = font_cache_size is None
+        self.font_cache = FontCache(
+            FONT_CACHE_SIZE if font_cache_size is None else font_cache_size
+        )
+        if preload_fonts:
+            self.font_cache.preload(self.l_fonts, self.font_size_range)
+
+        # Rasterized glyphs memory
+        self.glyph_atlas: Optional[GlyphAtlas] = None
+        if glyph_atlas:
+            self.glyph_atlas = GlyphAtlas(glyph_atlas_max_bytes)
+
+        # Pre-rendered decoy layers (it can be shared between generators)
+        self.layer_cache = layer_cache
+
+        # Recycled images buffers
+        self.buffer_pool: Optional[BufferPool] = None
+        if buffer_pool:
+            self.buffer_pool = BufferPool()
+
+    @property
+    def l_fonts(self) -> List[str]:
+        """Fonts files to use (discovered on first use)."""
+
+        fonts = self._l_fonts
+        if fonts is None:
+            fonts = self.font_registry.get_fonts(self.font_tag)
+            if not fonts:
+                fonts = self.font_registry.get_fonts()
+            self.l_fonts = fonts
+        return fonts
+
+    @l_fonts.setter
+    def l_fonts(self, fonts: List[str]) -> None:
+        self._l_fonts = list(fonts)
+        if self.font_cache_autosize:
+            num_sizes = self.font_size_range[1] - self.font_size_range[0] + 1
+            self.font_cache.max_size = max(
+                self.font_cache.max_size, len(self._l_fonts) * num_sizes
+            )
+
+    @property
+    def contrast_palette(self) -> ContrastPalette:
+        """Precomputed characters colors for each background luminance."""
+
+        return get_contrast_palette(self.contrast_ratio)
+
+    def seed(self, rng: Any) -> None:
+        """Set a new random numbers source (i.e. an int seed to reproduce
+        the same captchas again).
+
+        Parameters
+        ----------
+        rng : Any
+        """
+
+        self.rng = make_rng(rng)
+        self._numpy_rngs = local()
+
+    def numpy_rng(self) -> Any:
+        """Get a numpy random Generator for bulk random draws, derived from
+        the generator random numbers source (it is created once for each
+        thread).
+
+        Returns
+        -------
+        numpy.random.Generator
+        """
+
+        if isinstance(self.rng, NumpyRandom):
+            return self.rng.generator
+        np_rng = getattr(self._numpy_rngs, "generator", None)
+        if np_rng is None:
+            np_rng = import_numpy().random.default_rng(
+                self.rng.randint(0, 2**63 - 1)
+            )
+            self._numpy_rngs.generator = np_rng
+        return np_rng
+
+    def stage(self, name: str) -> Any:
+        """Get a context manager that reports the time spent inside it as the
+        given generation stage to the metrics sink (if any).
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        Any
+        """
+
+        return stage_timer(self.metrics, name)
+
+    def new_image(self, size: Tuple[int, int], color: Color = 0
+                  ) -> Image.Image:
+        """Get a new RGB image filled with a color (from the buffer pool if
+        it is enabled).
+
+        Parameters
+        ----------
+        size : Tuple[int, int]
+        color : Color, optional
+            by default 0 (black)
+
+        Returns
+        -------
+        Image.Image
+        """
+
+        if self.buffer_pool is not None:
+            return self.buffer_pool.acquire("RGB", size, color)
+        return Image.new("RGB", size, color)
+
+    def release_image(self, image: Image.Image) -> None:
+        """Give back an image that is not going to be used anymore to the
+        buffer pool (if it is enabled).
+
+        Parameters
+        ----------
+        image : Image.Image
+        """
+
+        if self.buffer_pool is not None:
+            self.buffer_pool.release(image)
+
+    def release(self, captcha: Any) -> None:
+        """Give back the image of a captcha (CaptchaModel or
+        MathsCaptchaModel) that is not going to be used anymore, to recycle
+        it for next captchas (if the buffer pool is enabled).
+
+        Parameters
+        ----------
+        captcha : Any
+        """
+
+        self.release_image(captcha.image)
+
+    def preload_glyph_atlas(self, characters: str) -> None:
+        """Rasterize into the glyph atlas the provided characters for all
+        the fonts and font sizes that the generator could use.
+
+        Parameters
+        ----------
+        characters : str
+        """
+
+        if self.glyph_atlas is None:
+            return
+        for font_path in self.l_fonts:
+            for font_size in self.glyph_atlas.sizes_of(*self.font_size_range):
+                font = self.font_cache.get(font_path, font_size)
+                for character in characters:
+                    self.glyph_atlas.get(character, font)
 
     def gen_rand_color(self, min_val=0, max_val=255) -> RGBModel:
         """Generate a random color.
@@ -71,9 +307,9 @@ class CaptchaGenerator:
         """
 
         return RGBModel(
-            R=randint(min_val, max_val),
-            G=randint(min_val, max_val),
-            B=randint(min_val, max_val)
+            R=self.rng.randint(min_val, max_val),
+            G=self.rng.randint(min_val, max_val),
+            B=self.rng.randint(min_val, max_val)
         )
 
     def gen_rand_contrast_color(self, from_color: RGBModel) -> RGBModel:
@@ -102,14 +338,15 @@ class CaptchaGenerator:
         }
 
         if dark_level in levels:
-            color = self.gen_rand_color(levels[dark_level])
+            color = self.gen_rand_color(*levels[dark_level])
         else:
             color = RGBModel(0, 0, 0)
 
         return color
 
     def gen_rand_custom_contrast_color(self, from_color: RGBModel) -> RGBModel:
-        """Generate a random dark or light color for a custom contrast.
+        """Generate a random color with the min WCAG contrast ratio to the
+        provided one.
 
         Parameters
         ----------
@@ -120,28 +357,11 @@ class CaptchaGenerator:
         RGBModel
         """
 
-        # Get light-dark tonality level of the provided color
-        dark_level = self.color_dark_level(
-            from_color["R"], from_color["G"], from_color["B"]
+        # Pick a color of the precomputed ones with enough contrast for the
+        # provided color luminance (randomly jittered)
+        return RGBModel(
+            *self.contrast_palette.pick(from_color.rgb, self.rng)
         )
-        # If it is a dark color
-        if dark_level >= 1:
-            # from_color -> (255 - 384) -> (85 - 128)
-            color = self.gen_rand_color(148, 255)
-            # For high dark
-            if dark_level == 3:
-                # from_color -> (0 - 128) -> (0 - 42)
-                color = self.gen_rand_color(62, 255)
-        # If it is a light color
-        else:
-            # from_color -> (384 - 640) -> (128 - 213)
-            color = self.gen_rand_color(0, 108)
-            # For high light
-            if dark_level == -3:
-                # from_color -> (640 - 765) -> (213 - 255)
-                color = self.gen_rand_color(0, 193)
-
-        return color
 
     def color_dark_level(self, r: int, g: int, b: int) -> int:
         """Determine provided color dark tonality level from -3 to 3 (-3 ultra light, \
@@ -165,7 +385,6 @@ class CaptchaGenerator:
                 dark_level = 2
                 if r + g + b < 128:
                     dark_level = 3
-            return True
         else:
             dark_level = -1
             if r + g + b > 512:
@@ -204,11 +423,13 @@ class CaptchaGenerator:
         str
         """
 
-        return fonts_list[randint(0, len(fonts_list) - 1)]
+        return fonts_list[self.rng.randint(0, len(fonts_list) - 1)]
 
     def gen_rand_size_font(self, font_path: str, min_size: int,
                            max_size: int) -> FreeTypeFont:
-        """Generate a random size font PIL object from the given font file path.
+        """Get a random size font PIL object from the given font file path
+        (loaded fonts are cached). Just the glyph atlas font sizes of the
+        range are used if it is enabled.
 
         Parameters
         ----------
@@ -221,17 +442,16 @@ class CaptchaGenerator:
         FreeTypeFont
         """
 
-        font_size = randint(min_size, max_size)
-        try:
-            font = ImageFont.truetype(font_path, font_size)
-        except OSError:
-            print("Incompatible font for captcha. Using standard arial.ttf")
-            font = ImageFont.truetype("arial.ttf", font_size)
-
-        return font
+        if self.glyph_atlas is not None:
+            font_size = self.rng.choice(
+                self.glyph_atlas.sizes_of(min_size, max_size)
+            )
+        else:
+            font_size = self.rng.randint(min_size, max_size)
+        return self.font_cache.get(font_path, font_size)
 
-    def create_image_char(self, size: Tuple[int, int], background: float,
-                          character: Union[str, bytes], char_color,
+    def create_image_char(self, size: Tuple[int, int], background: Color,
+                          character: Union[str, bytes], char_color: Color,
                           char_pos: Tuple[float, float], char_font: Any
                           ) -> Image.Image:
         """Create a PIL image object of specified size and color that
@@ -240,9 +460,9 @@ class CaptchaGenerator:
         Parameters
         ----------
         size : Tuple[int, int]
-        background : float
+        background : Color
         character : Union[str, bytes]
-        char_color : [type]
+        char_color : Color
         char_pos : Tuple[float, float]
         char_font : Any
 
@@ -251,15 +471,29 @@ class CaptchaGenerator:
         Image
         """
 
-        image = Image.new("RGBA", size, background)
+        image = self.new_image(size, background)
+
+        # Compose the already rasterized glyph if glyph atlas is enabled
+        if self.glyph_atlas is not None:
+            mask, offset = self.glyph_atlas.get(str(character), char_font)
+            if mask is not None:
+                image.paste(
+                    char_color,
+                    (int(char_pos[0]) + offset[0],
+                     int(char_pos[1]) + offset[1]),
+                    mask
+                )
+            return image
+
         draw = ImageDraw.Draw(image)
         draw.text(char_pos, character, fill=char_color, font=char_font)
 
         return image
 
     def add_rand_circle_to_image(self, image: Image.Image, min_size: int,
-                                 max_size: int, circle_color: str = None
-                                 ) -> None:
+                                 max_size: int,
+                                 circle_color: Optional[Color] = None,
+                                 box: Optional[Box] = None) -> None:
         """Draw a random circle to a PIL image.
 
         Parameters
@@ -267,17 +501,20 @@ class CaptchaGenerator:
         image : Image.Image
         min_size : int
         max_size : int
-        circle_color : str, optional
+        circle_color : Color, optional
             by default None
+        box : Box, optional
+            image region (left, top, right, bottom) where to place the
+            circle, by default the full image
         """
 
-        x = randint(0, image.width)
-        y = randint(0, image.height)
-        rad = randint(min_size, max_size)
+        if box is None:
+            box = (0, 0, image.width, image.height)
+        x = self.rng.randint(box[0], box[2])
+        y = self.rng.randint(box[1], box[3])
+        rad = self.rng.randint(min_size, max_size)
         if circle_color is None:
-            circle_color = RGBModel(
-                randint(0, 255), randint(0, 255), randint(0, 255)
-            ).color
+            circle_color = self.gen_rand_color().rgb
 
         draw = ImageDraw.Draw(image)
         draw.ellipse(
@@ -288,7 +525,8 @@ class CaptchaGenerator:
 
     def add_rand_ellipse_to_image(self, image: Image.Image, w_min: int,
                                   w_max: int, h_min: int, h_max: int,
-                                  ellipse_color: str = None) -> None:
+                                  ellipse_color: Optional[Color] = None
+                                  ) -> None:
         """Draw a random ellipse to a PIL image.
 
         Parameters
@@ -298,18 +536,16 @@ class CaptchaGenerator:
         w_max : int
         h_min : int
         h_max : int
-        ellipse_color : str, optional
+        ellipse_color : Color, optional
             by default None
         """
 
-        x = randint(0, image.width)
-        y = randint(0, image.height)
-        w = randint(w_min, w_max)
-        h = randint(h_min, h_max)
+        x = self.rng.randint(0, image.width)
+        y = self.rng.randint(0, image.height)
+        w = self.rng.randint(w_min, w_max)
+        h = self.rng.randint(h_min, h_max)
         if ellipse_color is None:
-            ellipse_color = RGBModel(
-                randint(0, 255), randint(0, 255), randint(0, 255)
-            ).color
+            ellipse_color = self.gen_rand_color().rgb
 
         draw = ImageDraw.Draw(image)
         draw.ellipse(
@@ -319,7 +555,7 @@ class CaptchaGenerator:
         )
 
     def add_rand_line_to_image(self, image: Image.Image, line_width: int = 5,
-                               line_color: str = None) -> None:
+                               line_color: Optional[Color] = None) -> None:
         """Draw a random line to a PIL image.
 
         Parameters
@@ -327,35 +563,37 @@ class CaptchaGenerator:
         image : Image.Image
         line_width : int, optional
             by default 5
-        line_color : str, optional
+        line_color : Color, optional
             by default None
         """
 
         # Get line random start position
-        line_x0 = randint(0, image.width)
-        line_y0 = randint(0, image.height)
+        line_x0 = self.rng.randint(0, image.width)
+        line_y0 = self.rng.randint(0, image.height)
         # If line x0 is in center-to-right
         if line_x0 >= image.width/2:
             # Line x1 from 0 to line_x0 position - 20% of image width
-            line_x1 = randint(0, line_x0 - int(0.2*image.width))
+            line_x1 = self.rng.randint(0, line_x0 - int(0.2*image.width))
         else:
             # Line x1 from line_x0 position + 20% of
             # image width to max image width
-            line_x1 = randint(line_x0 + int(0.2*image.width), image.width)
+            line_x1 = self.rng.randint(
+                line_x0 + int(0.2*image.width), image.width
+            )
         # If line y0 is in center-to-bottom
         if line_y0 >= image.height/2:
             # Line y1 from 0 to line_y0 position - 20% of image height
-            line_y1 = randint(0, line_y0 - int(0.2*image.height))
+            line_y1 = self.rng.randint(0, line_y0 - int(0.2*image.height))
         else:
             # Line y1 from line_y0 position + 20% of
             # image height to max image height
-            line_y1 = randint(line_y0 + int(0.2*image.height), image.height)
+            line_y1 = self.rng.randint(
+                line_y0 + int(0.2*image.height), image.height
+            )
 
         # Generate a rand line color if not provided
         if line_color is None:
-            line_color = RGBModel(
-                randint(0, 255), randint(0, 255), randint(0, 255)
-            ).color
+            line_color = self.gen_rand_color().rgb
 
         # Get image draw interface and draw the line on it
         draw = ImageDraw.Draw(image)
@@ -365,40 +603,161 @@ class CaptchaGenerator:
         )
 
     def add_rand_horizontal_line_to_image(self, image: Image.Image,
-                                          line_color: Union[str, int] = None
+                                          line_color: Optional[Color] = None,
+                                          box: Optional[Box] = None
                                           ) -> None:
         """Draw a random line to a PIL image.
 
         Parameters
         ----------
         image : Image.Image
-        line_color : Union[str, int], optional
+        line_color : Color, optional
             by default None
+        box : Box, optional
+            image region (left, top, right, bottom) where to place the
+            line, by default the full image
         """
 
+        if box is None:
+            box = (0, 0, image.width, image.height)
+        width = box[2] - box[0]
+
         # Get line random start position (x between 0 and 20% image width;
         # y with full height range)
-        x0 = randint(0, int(0.2*image.width))
-        y0 = randint(0, image.height)
+        x0 = box[0] + self.rng.randint(0, int(0.2*width))
+        y0 = self.rng.randint(box[1], box[3])
 
         # Get line end position (x1 symetric to x0;
         # y random from y0 to image height)
-        x1 = image.width - x0
-        y1 = randint(y0, image.height)
+        x1 = box[2] - (x0 - box[0])
+        y1 = self.rng.randint(y0, box[3])
 
         # Generate a rand line color if not provided
         if line_color is None:
-            line_color = RGBModel(
-                randint(0, 255), randint(0, 255), randint(0, 255)
-            ).color
+            line_color = self.gen_rand_color().rgb
 
         # Get image draw interface and draw the line on it
         draw = ImageDraw.Draw(image)
         draw.line((x0, y0, x1, y1), fill=line_color, width=5)
 
+    def add_rand_overlay_to_image(self, image: Image.Image, num_lines: int,
+                                  num_circles: int, min_size: int,
+                                  max_size: int, box: Optional[Box] = None
+                                  ) -> None:
+        """Draw random horizontal lines (as add_rand_horizontal_line_to_image)
+        and circles (as add_rand_circle_to_image) to a PIL image in a single
+        pass. The geometry of all the shapes is generated in one go if numpy
+        is already imported (or the random numbers source is numpy based).
+
+        Parameters
+        ----------
+        image : Image.Image
+        num_lines : int
+        num_circles : int
+        min_size : int
+            circles min size
+        max_size : int
+            circles max size
+        box : Box, optional
+            image region (left, top, right, bottom) where to place the
+            shapes, by default the full image
+        """
+
+        if (num_lines <= 0) and (num_circles <= 0):
+            return
+        if box is None:
+            box = (0, 0, image.width, image.height)
+        max_x0 = int(0.2*(box[2] - box[0]))
+        np = bulk_numpy(self.rng)
+        if np is not None:
+            np_rng = self.numpy_rng()
+            x0 = box[0] + np_rng.integers(0, max_x0, num_lines, endpoint=True)
+            y0 = np_rng.integers(box[1], box[3], num_lines, endpoint=True)
+            # Line y1 random from y0 to the region bottom
+            y1 = y0 + (np_rng.random(num_lines) * (box[3] - y0 + 1)).astype(
+                np.int64
+            )
+            lines = zip(
+                x0.tolist(), y0.tolist(), y1.tolist(),
+                np_rng.integers(1, 5, num_lines, endpoint=True).tolist()
+            )
+            circles = zip(
+                np_rng.integers(
+                    box[0], box[2], num_circles, endpoint=True
+                ).tolist(),
+                np_rng.integers(
+                    box[1], box[3], num_circles, endpoint=True
+                ).tolist(),
+                np_rng.integers(
+                    min_size, max_size, num_circles, endpoint=True
+                ).tolist(),
+                map(tuple, np_rng.integers(
+                    0, 256, (num_circles, 3)
+                ).tolist())
+            )
+        else:
+            randint = self.rng.randint
+            lines_list = []
+            for _ in range(0, num_lines):
+                x = box[0] + randint(0, max_x0)
+                y = randint(box[1], box[3])
+                lines_list.append(
+                    (x, y, randint(y, box[3]), randint(1, 5))
+                )
+            lines = iter(lines_list)  # type: ignore
+            circles = iter([  # type: ignore
+                (randint(box[0], box[2]), randint(box[1], box[3]),
+                 randint(min_size, max_size), self.gen_rand_color().rgb)
+                for _ in range(0, num_circles)
+            ])
+
+        # Rasterize all the shapes with the same draw interface
+        draw = ImageDraw.Draw(image)
+        for x, y, y_end, line_red in lines:
+            # Line x1 symetric to x0, and a near black color (opaque in
+            # RGBA images too)
+            draw.line(
+                (x, y, box[2] - (x - box[0]), y_end),
+                fill=(line_red, 0, 0), width=5
+            )
+        for x, y, rad, circle_color in circles:
+            draw.ellipse(
+                (x, y, x+rad, y+rad), fill=circle_color, outline=circle_color
+            )
+
+    def add_decoys_to_image(self, image: Image.Image, num_lines: int,
+                            num_circles: int, min_size: int, max_size: int,
+                            box: Box) -> None:
+        """Add the decoy horizontal lines and circles to a captcha image
+        region, from the layer cache if it is enabled.
+
+        Parameters
+        ----------
+        image : Image.Image
+        num_lines : int
+        num_circles : int
+        min_size : int
+            circles min size
+        max_size : int
+            circles max size
+        box : Box
+            image region (left, top, right, bottom)
+        """
+
+        if self.layer_cache is not None:
+            self.layer_cache.composite(
+                self, image, box, num_lines, num_circles, min_size, max_size
+            )
+            return
+        self.add_rand_overlay_to_image(
+            image, num_lines, num_circles, min_size, max_size, box
+        )
+
     def add_rand_noise_to_image(self, image: Image.Image,
                                 num_pixels: int) -> None:
-        """Add noise pixels to a PIL image.
+        """Add noise pixels to a PIL image (all the pixels are written in one
+        go with numpy if it is already imported, or if there are enough
+        pixels to be worth importing it).
 
         Parameters
         ----------
@@ -406,16 +765,36 @@ class CaptchaGenerator:
         num_pixels : int
         """
 
-        draw = ImageDraw.Draw(image)
+        if num_pixels <= 0:
+            return
+        bands = len(image.getbands())
+        np = bulk_numpy(self.rng, num_pixels)
+        if np is not None:
+            pixels = np.array(image)
+            np_rng = self.numpy_rng()
+            x = np_rng.integers(0, image.width, num_pixels)
+            y = np_rng.integers(0, image.height, num_pixels)
+            colors = np_rng.integers(
+                0, 256, (num_pixels, bands), dtype=np.uint8
+            )
+            # Keep noise pixels opaque in images with alpha channel
+            if bands == 4:
+                colors[:, 3] = 255
+            if bands == 1:
+                colors = colors[:, 0]
+            pixels[y, x] = colors
+            image.frombytes(pixels.tobytes())
+            return
+        pixels = image.load()
+        alpha = (255,) if bands == 4 else ()
+        randint = self.rng.randint
         for _ in range(0, num_pixels):
-            pixel_color = RGBModel(
+            pixel_color = (
                 randint(0, 255), randint(0, 255), randint(0, 255)
-            ).color
-
-            draw.point(
-                (randint(0, image.width), randint(0, image.height)),
-                pixel_color
-            )
+            ) + alpha
+            pixels[  # type: ignore
+                randint(0, image.width - 1), randint(0, image.height - 1)
+            ] = pixel_color[0] if bands == 1 else pixel_color
 
     def images_join_horizontal(self, list_images: List[Image.Image]
                                ) -> Image.Image:
@@ -434,8 +813,8 @@ class CaptchaGenerator:
         image = Image.new(
             "RGB",
             (
-                self.one_char_image_size[0] * len(list_images),
-                self.one_char_image_size[1]
+                sum(img.size[0] for img in list_images),
+                max((img.size[1] for img in list_images), default=0)
             )
         )
 
@@ -449,7 +828,8 @@ class CaptchaGenerator:
     def gen_captcha_char_image(self, character: str,
                                image_size: Tuple[int, int], lines: int = 2,
                                background_color: RGBModel = None,
-                               rotation_limits: Tuple[int, int] = (-55, 55)
+                               rotation_limits: Tuple[int, int] = (-55, 55),
+                               noise_pixels: Optional[int] = None
                                ) -> CaptchaCharModel:
         """Generate an one-char image with a random positioned-rotated character.
 
@@ -463,6 +843,9 @@ class CaptchaGenerator:
             by default None
         rotation_limits : Tuple[int, int], optional
             by default (-55, 55)
+        noise_pixels : int, optional
+            number of random noise pixels to add, by default NOISE_PIXELS
+            if ADD_NOISE is enabled or 0 otherwise
 
         Returns
         -------
@@ -474,44 +857,112 @@ class CaptchaGenerator:
             background_color = self.gen_rand_color()
 
         rand_color = self.gen_rand_custom_contrast_color(background_color)
-        character_color = rand_color["color"]
+        character_color = rand_color.rgb
         character_pos = (
-            int(image_size[0]/4), randint(0, int(image_size[0]/4))
+            int(image_size[0]/4), self.rng.randint(0, int(image_size[0]/4))
         )
 
         # Pick a random font with a random size, from the provided list
         rand_font_path = self.gen_rand_font(self.l_fonts)
-        character_font = self.gen_rand_size_font(
-            rand_font_path, self.font_size_range[0],
-            self.font_size_range[1]
-        )
+        with self.stage("font"):
+            character_font = self.gen_rand_size_font(
+                rand_font_path, self.font_size_range[0],
+                self.font_size_range[1]
+            )
 
         # Create an image of specified size, background color and character
-        image = self.create_image_char(
-            image_size, background_color["color"], character,
-            character_color, character_pos, character_font
-        )
+        with self.stage("char_image"):
+            image = self.create_image_char(
+                image_size, background_color.rgb, character,
+                character_color, character_pos, character_font
+            )
 
         # Random rotate the created image between -55? and +55?
-        image = image.rotate(
-            randint(rotation_limits[0], rotation_limits[1]),
-            fillcolor=background_color["color"]
-        )
+        with self.stage("rotate"):
+            rotated = image.rotate(
+                self.rng.randint(rotation_limits[0], rotation_limits[1]),
+                fillcolor=background_color.rgb
+            )
+            self.release_image(image)
+            image = rotated
 
         # Add some random lines to image
-        for _ in range(0, lines):
-            self.add_rand_line_to_image(image, 3, character_color)
+        with self.stage("lines"):
+            for _ in range(0, lines):
+                self.add_rand_line_to_image(image, 3, character_color)
 
         # Add noise pixels to the image
-        if ADD_NOISE:
-            self.add_rand_noise_to_image(image, 200)
+        if noise_pixels is None:
+            noise_pixels = NOISE_PIXELS if ADD_NOISE else 0
+        with self.stage("noise"):
+            self.add_rand_noise_to_image(image, noise_pixels)
 
         # Return the generated image
         return CaptchaCharModel(image=image, character=character)
 
+    def one_char_size(self, num_chars: int) -> Tuple[int, int]:
+        """Determine the size of each one-char image for a captcha of the
+        given number of characters.
+
+        Parameters
+        ----------
+        num_chars : int
+
+        Returns
+        -------
+        Tuple[int, int]
+        """
+
+        char_size = self.captcha_size[0] / num_chars
+        if char_size - int(char_size) <= 0.5:
+            char_size = int(char_size)
+        else:
+            char_size = int(char_size) + 1
+        return (char_size, char_size)
+
+    def limit_difficult_level(self, difficult_level: int) -> int:
+        """Limit difficult level argument if out of expected range.
+
+        Parameters
+        ----------
+        difficult_level : int
+
+        Returns
+        -------
+        int
+        """
+
+        if difficult_level < 0:
+            difficult_level = 0
+        elif difficult_level >= len(DIFFICULT_LEVELS_VALUES):
+            difficult_level = len(DIFFICULT_LEVELS_VALUES) - 1
+        return difficult_level
+
+    def gen_rand_characters(self, num_chars: int,
+                            chars_mode: str = "nums") -> str:
+        """Generate a random string of characters of the given chars mode.
+
+        Parameters
+        ----------
+        num_chars : int
+        chars_mode : str, optional
+            by default "nums"
+
+        Returns
+        -------
+        str
+        """
+
+        # If invalid chars mode provided, use numbers
+        characters_availables = CHARS_MODES.get(
+            chars_mode.lower(), CHARS_MODES["nums"]
+        )
+        return "".join(self.rng.choices(characters_availables, k=num_chars))
+
     def gen_captcha_image(self, difficult_level: int = 2,
                           chars_mode: str = "nums", multicolor: bool = False,
-                          margin: bool = True) -> CaptchaModel:
+                          margin: bool = True,
+                          noise_pixels: Optional[int] = None) -> CaptchaModel:
         """Generate an image captcha.
 
         Parameters
@@ -524,97 +975,269 @@ class CaptchaGenerator:
             by default False
         margin : bool, optional
             by default True
+        noise_pixels : int, optional
+            number of random noise pixels to add to each character image,
+            by default NOISE_PIXELS if ADD_NOISE is enabled or 0 otherwise
 
         Returns
         -------
         CaptchaModel
         """
 
-        # Limit difficult level argument if out of expected range
-        if difficult_level > 5:
-            difficult_level = 5
+        difficult_level = self.limit_difficult_level(difficult_level)
+        characters = self.gen_rand_characters(4, chars_mode)
+        return self._gen_captcha_image(
+            characters, difficult_level, multicolor, margin, noise_pixels
+        )
 
-        # If invalid chars mode provided, use numbers
-        chars_mode = chars_mode.lower()
-        if chars_mode not in ("nums", "hex", "ascii"):
-            chars_mode = "nums"
-
-        # Determine one char image height
-        fourth_size = self.captcha_size[0] / 4
-        if fourth_size - int(fourth_size) <= 0.5:
-            fourth_size = int(fourth_size)
-        else:
-            fourth_size = int(fourth_size) + 1
-        self.one_char_image_size = (fourth_size, fourth_size)
+    def gen_captcha_batch(self, num_captchas: int, difficult_level: int = 2,
+                          chars_mode: str = "nums", multicolor: bool = False,
+                          margin: bool = True,
+                          noise_pixels: Optional[int] = None
+                          ) -> List[CaptchaModel]:
+        """Generate multiple image captchas at once. It is a convenience
+        loop, not a faster path: just the arguments validation and the
+        characters draw are shared, and each captcha is rendered as in
+        gen_captcha_image() (use CaptchaPool or CaptchaThreadPool for
+        throughput).
+
+        Parameters
+        ----------
+        num_captchas : int
+        difficult_level : int, optional
+            by default 2
+        chars_mode : str, optional
+            by default "nums"
+        multicolor : bool, optional
+            by default False
+        margin : bool, optional
+            by default True
+        noise_pixels : int, optional
+            number of random noise pixels to add to each character image,
+            by default NOISE_PIXELS if ADD_NOISE is enabled or 0 otherwise
+
+        Returns
+        -------
+        List[CaptchaModel]
+        """
+
+        difficult_level = self.limit_difficult_level(difficult_level)
+        # Generate the characters of all the captchas in one go
+        characters = self.gen_rand_characters(4 * num_captchas, chars_mode)
+        return [
+            self._gen_captcha_image(
+                characters[i:i+4], difficult_level, multicolor, margin,
+                noise_pixels
+            )
+            for i in range(0, 4 * num_captchas, 4)
+        ]
+
+    def gen_captcha_bytes(self, image_format: str = "png",
+                          compress_level: Optional[int] = None,
+                          quality: Optional[int] = None,
+                          quantize: Optional[int] = None,
+                          **captcha_kwargs: Any) -> EncodedCaptchaModel:
+        """Generate an image captcha already encoded in the given image
+        file format (gen_captcha_image() arguments are accepted).
+
+        Parameters
+        ----------
+        image_format : str, optional
+            "png", "webp" or "jpeg", by default "png"
+        compress_level : int, optional
+            PNG zlib compression level (0-9), by default PNG_COMPRESS_LEVEL
+        quality : int, optional
+            WebP and JPEG quality (0-100), by default LOSSY_QUALITY
+        quantize : int, optional
+            reduce the PNG image to a palette of this number of colors,
+            by default None (no quantization)
+
+        Returns
+        -------
+        EncodedCaptchaModel
+        """
+
+        captcha = self.gen_captcha_image(**captcha_kwargs)
+        encoded = encode_captcha(
+            captcha, image_format, compress_level=compress_level,
+            quality=quality, quantize=quantize
+        )
+        self.release(captcha)
+        return encoded
+
+    def _gen_captcha_image(self, characters: str, difficult_level: int,
+                           multicolor: bool, margin: bool,
+                           noise_pixels: Optional[int]) -> CaptchaModel:
+        """Generate an image captcha of the provided characters (arguments
+        are expected to be already validated).
+
+        Parameters
+        ----------
+        characters : str
+        difficult_level : int
+        multicolor : bool
+        margin : bool
+        noise_pixels : int, optional
+
+        Returns
+        -------
+        CaptchaModel
+        """
+
+        char_size = self.one_char_image_sizes[4]
 
         # Generate a RGB background color if the multicolor is disabled
         if not multicolor:
             image_background = self.gen_rand_color()
 
-        # Generate 4 one-character images with a
+        # Create the final captcha image
+        with self.stage("canvas"):
+            image, box = self.new_captcha_canvas(len(characters), margin)
+
+        # Generate the one-character images with a
         # random char color in contrast to the generated
         # background, a random font and font size, and random position-rotation
-        one_char_images = []
-        image_characters = ""
-        for _ in range(0, 4):
-            # Generate a random character
-            if chars_mode == "nums":
-                character = str(randint(0, 9))
-            elif chars_mode == "hex":
-                characters_availables = "ABCDEF0123456789"
-                character = choice(characters_availables)
-            else:
-                characters_availables = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-                character = choice(characters_availables)
-
+        # and place them directly into the captcha image
+        x_offset = box[0]
+        for character in characters:
             # Generate a RGB background color for
             # each iteration if multicolor enabled
             if multicolor:
                 image_background = self.gen_rand_color()
 
-            # Generate a random character, a random character color
-            # in contrast to background and a random position for it
+            # Generate a random character color in contrast to
+            # background and a random position for it
             captcha = self.gen_captcha_char_image(
-                character, self.one_char_image_size, 2,
-                image_background  # type: ignore
+                character, char_size, 2,
+                image_background,  # type: ignore
+                noise_pixels=noise_pixels
             )
-            image = captcha["image"]
-            image_characters = image_characters + captcha["character"]
 
-            # Add the generated image to the list
-            one_char_images.append(image)
+            # Place the generated image in its captcha position
+            with self.stage("join"):
+                image.paste(captcha["image"], (x_offset, box[1]))
+            self.release_image(captcha["image"])
+            x_offset += char_size[0]
+
+        # Add random horizontal lines and circles to the characters region
+        with self.stage("overlay"):
+            self.add_decoys_to_image(
+                image, DIFFICULT_LEVELS_VALUES[difficult_level][0],
+                DIFFICULT_LEVELS_VALUES[difficult_level][1],
+                int(0.05*char_size[0]), int(0.15*char_size[1]), box
+            )
 
-        # Join the 4 characters images into one
-        image = self.images_join_horizontal(one_char_images)
+        # Clear horizontal margins from shapes drawn out of the characters
+        if margin:
+            with self.stage("margin"):
+                self.clear_captcha_margins(image, box)
 
-        # Add one horizontal random line to full image
-        for _ in range(0, DIFFICULT_LEVELS_VALUES[difficult_level][0]):
-            self.add_rand_horizontal_line_to_image(image, randint(1, 5))
+        # Return generated image captcha
+        return CaptchaModel(image=image, characters=characters)
 
-        # Add some random circles to the image
-        for _ in range(0, DIFFICULT_LEVELS_VALUES[difficult_level][1]):
-            self.add_rand_circle_to_image(
-                image, int(0.05*self.one_char_image_size[0]),
-                int(0.15*self.one_char_image_size[1])
-            )
-        # Add horizontal margins
-        if margin:
-            new_image = Image.new(
-                "RGBA", self.captcha_size, RGBModel(0, 0, 0).color
+    def new_captcha_canvas(self, num_chars: int, margin: bool
+                           ) -> Tuple[Image.Image, Box]:
+        """Create the captcha image where the one-char images will be
+        placed, and get the region that the characters will fill (it is
+        vertically centered in a black image of the captcha size if margin
+        is enabled).
+
+        Parameters
+        ----------
+        num_chars : int
+        margin : bool
+
+        Returns
+        -------
+        Tuple[Image.Image, Box]
+        """
+
+        char_size = self.one_char_image_sizes.get(num_chars)
+        if char_size is None:
+            char_size = self.one_char_size(num_chars)
+        chars_width = char_size[0] * num_chars
+        chars_height = char_size[1]
+        if not margin:
+            image = self.new_image((chars_width, chars_height))
+            return (image, (0, 0, chars_width, chars_height))
+        image = self.new_image(self.captcha_size, (0, 0, 0))
+        top = int((self.captcha_size[1]/2) - (chars_height/2))
+        box = (
+            0, top, min(chars_width, self.captcha_size[0]),
+            top + chars_height
+        )
+        return (image, box)
+
+    def clear_captcha_margins(self, image: Image.Image, box: Box) -> None:
+        """Fill with black the image area out of the provided region.
+
+        Parameters
+        ----------
+        image : Image.Image
+        box : Box
+        """
+
+        draw = ImageDraw.Draw(image)
+        if box[1] > 0:
+            draw.rectangle((0, 0, image.width, box[1] - 1), fill=(0, 0, 0))
+        if box[3] < image.height:
+            draw.rectangle(
+                (0, box[3], image.width, image.height), fill=(0, 0, 0)
             )
-            new_image.paste(
-                image,
-                (0, int((self.captcha_size[1]/2) - (image.height/2)))
+        if box[2] < image.width:
+            draw.rectangle(
+                (box[2], box[1], image.width, box[3] - 1), fill=(0, 0, 0)
             )
-            image = new_image
 
-        # Return generated image captcha
-        return CaptchaModel(image=image, characters=image_characters)
+    def gen_math_equation(self, allow_multiplication: bool = False
+                          ) -> Tuple[str, int, int, int]:
+        """Generate random equation with non-decimal and positive result
+        value.
+
+        Parameters
+        ----------
+        allow_multiplication : bool, optional
+            by default False
+
+        Returns
+        -------
+        Tuple[str, int, int, int]
+            operator character, first number, second number and result
+        """
+
+        # Random select math operator character
+        possible_chars = "+-"
+        if allow_multiplication:
+            # possible_chars = "+-x/" # Division operation
+            # commented due could be difficult to humans
+            possible_chars = "+-x"
+        operation = self.rng.choice(possible_chars)
+
+        eq_num1 = self.rng.randint(10, 99)
+        eq_num2 = self.rng.randint(10, 99)
+        if operation == "+":
+            equation_result = eq_num1 + eq_num2
+        elif operation == "-":
+            # Shift variable values to get highest value in eq_num1 and
+            # get positive value result
+            if eq_num1 < eq_num2:
+                tmp = eq_num1
+                eq_num1 = eq_num2
+                eq_num2 = tmp
+            equation_result = eq_num1 - eq_num2
+        elif operation == "x":
+            equation_result = eq_num1 * eq_num2
+        else:
+            equation_result = eq_num1 + eq_num2
+
+        return (operation, eq_num1, eq_num2, equation_result)
 
     def gen_math_captcha_image(self, difficult_level: int = 0,
                                multicolor: bool = False,
                                allow_multiplication: bool = False,
-                               margin: bool = True) -> MathsCaptchaModel:
+                               margin: bool = True,
+                               noise_pixels: Optional[int] = None
+                               ) -> MathsCaptchaModel:
         """Generate a math image captcha.
 
         Parameters
@@ -627,66 +1250,148 @@ class CaptchaGenerator:
             by default False
         margin : bool, optional
             by default True
+        noise_pixels : int, optional
+            number of random noise pixels to add to each character image,
+            by default NOISE_PIXELS if ADD_NOISE is enabled or 0 otherwise
 
         Returns
         -------
         MathsCaptchaModel
         """
 
-        # Limit difficult level argument if out of expected range
-        if difficult_level > 5:
-            difficult_level = 5
+        difficult_level = self.limit_difficult_level(difficult_level)
+        equation = self.gen_math_equation(allow_multiplication)
+        return self._gen_math_captcha_image(
+            equation, difficult_level, multicolor, margin, noise_pixels
+        )
 
-        # Determine one char image height
-        fourth_size = self.captcha_size[0] / 5
-        if fourth_size - int(fourth_size) <= 0.5:
-            fourth_size = int(fourth_size)
-        else:
-            fourth_size = int(fourth_size) + 1
-        self.one_char_image_size = (fourth_size, fourth_size)
+    def gen_math_captcha_batch(self, num_captchas: int,
+                               difficult_level: int = 0,
+                               multicolor: bool = False,
+                               allow_multiplication: bool = False,
+                               margin: bool = True,
+                               noise_pixels: Optional[int] = None
+                               ) -> List[MathsCaptchaModel]:
+        """Generate multiple math image captchas at once. It is a
+        convenience loop, not a faster path: just the arguments validation
+        is shared, and each captcha is rendered as in
+        gen_math_captcha_image() (use CaptchaPool or CaptchaThreadPool for
+        throughput).
+
+        Parameters
+        ----------
+        num_captchas : int
+        difficult_level : int, optional
+            by default 0
+        multicolor : bool, optional
+            by default False
+        allow_multiplication : bool, optional
+            by default False
+        margin : bool, optional
+            by default True
+        noise_pixels : int, optional
+            number of random noise pixels to add to each character image,
+            by default NOISE_PIXELS if ADD_NOISE is enabled or 0 otherwise
+
+        Returns
+        -------
+        List[MathsCaptchaModel]
+        """
+
+        difficult_level = self.limit_difficult_level(difficult_level)
+        equations = [
+            self.gen_math_equation(allow_multiplication)
+            for _ in range(0, num_captchas)
+        ]
+        return [
+            self._gen_math_captcha_image(
+                equation, difficult_level, multicolor, margin, noise_pixels
+            )
+            for equation in equations
+        ]
+
+    def gen_math_captcha_bytes(self, image_format: str = "png",
+                               compress_level: Optional[int] = None,
+                               quality: Optional[int] = None,
+                               quantize: Optional[int] = None,
+                               **captcha_kwargs: Any
+                               ) -> EncodedMathsCaptchaModel:
+        """Generate a math image captcha already encoded in the given image
+        file format (gen_math_captcha_image() arguments are accepted).
+
+        Parameters
+        ----------
+        image_format : str, optional
+            "png", "webp" or "jpeg", by default "png"
+        compress_level : int, optional
+            PNG zlib compression level (0-9), by default PNG_COMPRESS_LEVEL
+        quality : int, optional
+            WebP and JPEG quality (0-100), by default LOSSY_QUALITY
+        quantize : int, optional
+            reduce the PNG image to a palette of this number of colors,
+            by default None (no quantization)
+
+        Returns
+        -------
+        EncodedMathsCaptchaModel
+        """
+
+        captcha = self.gen_math_captcha_image(**captcha_kwargs)
+        encoded = encode_math_captcha(
+            captcha, image_format, compress_level=compress_level,
+            quality=quality, quantize=quantize
+        )
+        self.release(captcha)
+        return encoded
+
+    def _gen_math_captcha_image(self, equation: Tuple[str, int, int, int],
+                                difficult_level: int, multicolor: bool,
+                                margin: bool, noise_pixels: Optional[int]
+                                ) -> MathsCaptchaModel:
+        """Generate a math image captcha of the provided equation
+        (arguments are expected to be already validated).
+
+        Parameters
+        ----------
+        equation : Tuple[str, int, int, int]
+        difficult_level : int
+        multicolor : bool
+        margin : bool
+        noise_pixels : int, optional
+
+        Returns
+        -------
+        MathsCaptchaModel
+        """
+
+        operation, eq_num1, eq_num2, equation_result = equation
+        char_size = self.one_char_image_sizes[5]
 
         # Generate a RGB background color
         img_background = self.gen_rand_color()
 
-        # Random select math operator character, colors and position
-        possible_chars = "+-"
-        if allow_multiplication:
-            # possible_chars = "+-x/" # Division operation
-            # commented due could be difficult to humans
-            possible_chars = "+-x"
-        character = choice(possible_chars)
+        # Create the final captcha image
+        with self.stage("canvas"):
+            image, box = self.new_captcha_canvas(5, margin)
 
         # Generate operator image
         captcha = self.gen_captcha_char_image(
-            character, self.one_char_image_size, 0, img_background, (-5, 5)
+            operation, char_size, 0, img_background, (-5, 5),
+            noise_pixels
         )
-        img_operator = captcha["image"]
-        operation = captcha["character"]
-
-        # Generate random equation with non-decimal and positive result value
-        eq_num1 = randint(10, 99)
-        eq_num2 = randint(10, 99)
-        if operation == "+":
-            equation_result = eq_num1 + eq_num2
-        elif operation == "-":
-            # Shift variable values to get highest value in eq_num1 and
-            # get positive value result
-            if eq_num1 < eq_num2:
-                tmp = eq_num1
-                eq_num1 = eq_num2
-                eq_num2 = tmp
-            equation_result = eq_num1 - eq_num2
-        elif operation == "x":
-            equation_result = eq_num1 * eq_num2
-        else:
-            equation_result = eq_num1 + eq_num2
+        with self.stage("join"):
+            image.paste(
+                captcha["image"],
+                (box[0] + 2*char_size[0], box[1])
+            )
+        self.release_image(captcha["image"])
 
-        equation_str = str(eq_num1) + str(eq_num2)
         # Generate equation images with a random char color
         # in contrast to the generated
         # background, a random font and font size, and random position-rotation
-        one_char_images = []
-        for char in equation_str:
+        # and place them directly into the captcha image (around operator)
+        x_offset = box[0]
+        for char in str(eq_num1) + str(eq_num2):
             # Generate a RGB background color for each iteration
             # if multicolor enabled
             if multicolor:
@@ -695,33 +1400,29 @@ class CaptchaGenerator:
             # in contrast to background
             # and a random position for it
             captcha = self.gen_captcha_char_image(
-                char, self.one_char_image_size, 0, img_background
+                char, char_size, 0, img_background,
+                noise_pixels=noise_pixels
             )
-            # Add the generated image to the list
-            one_char_images.append(captcha["image"])
-
-        # Join the characters images into one
+            # Place the generated image in its captcha position
+            if x_offset == box[0] + 2*char_size[0]:
+                x_offset += char_size[0]
+            with self.stage("join"):
+                image.paste(captcha["image"], (x_offset, box[1]))
+            self.release_image(captcha["image"])
+            x_offset += char_size[0]
         equation_str = str(eq_num1) + operation + str(eq_num2)
-        one_char_images.insert(2, img_operator)
-        image = self.images_join_horizontal(one_char_images)
-
-        # Add some random circles to the image
-        for _ in range(0, DIFFICULT_LEVELS_VALUES[difficult_level][1]):
-            self.add_rand_circle_to_image(
-                image,
-                int(0.05*self.one_char_image_size[0]),
-                int(0.15*self.one_char_image_size[1])
+
+        # Add some random circles to the characters region
+        with self.stage("overlay"):
+            self.add_decoys_to_image(
+                image, 0, DIFFICULT_LEVELS_VALUES[difficult_level][1],
+                int(0.05*char_size[0]), int(0.15*char_size[1]), box
             )
 
-        # Add horizontal margins
+        # Clear horizontal margins from shapes drawn out of the characters
         if margin:
-            new_image = Image.new(
-                "RGBA", self.captcha_size, RGBModel(0, 0, 0).color
-            )
-            new_image.paste(
-                image, (0, int((self.captcha_size[1]/2) - (image.height/2)))
-            )
-            image = new_image
+            with self.stage("margin"):
+                self.clear_captcha_margins(image, box)
 
         # Return generated image captcha
         return MathsCaptchaModel(
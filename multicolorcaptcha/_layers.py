@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from PIL import Image
+
+from ._constants import (
+    LAYER_CACHE_LAYERS, LAYER_CACHE_MAX_OFFSET, LAYER_CACHE_REFRESH_RATE
+)
+
+
+# (region width, region height, lines, circles, circles min size,
+# circles max size)
+LayerKey = Tuple[int, int, int, int, int, int]
+
+# Layer colors and binary mask of the shapes
+LayerImage = Tuple[Image.Image, Image.Image]
+
+# (layer, layer flipped left to right)
+Layer = Tuple[LayerImage, LayerImage]
+
+
+class LayerCache:
+    def __init__(self, layers: int = LAYER_CACHE_LAYERS,
+                 refresh_rate: float = LAYER_CACHE_REFRESH_RATE,
+                 max_offset: float = LAYER_CACHE_MAX_OFFSET) -> None:
+        """Pool of pre-rendered transparent decoy layers (the captcha
+        horizontal lines and circles) for each captcha region size and
+        difficult level. Each captcha composites a randomly picked layer,
+        randomly flipped and offset, over its characters, so the decoy
+        shapes cost the same at any difficult level. Layers are randomly
+        re-rendered at the refresh rate, so repeated layers don't become a
+        fingerprint (it is thread-safe).
+
+        Parameters
+        ----------
+        layers : int, optional
+            layers of each size and difficult level,
+            by default LAYER_CACHE_LAYERS
+        refresh_rate : float, optional
+            probability of re-rendering one layer on each use (0 to 1),
+            by default LAYER_CACHE_REFRESH_RATE
+        max_offset : float, optional
+            max random offset of the layers, relative to the region size,
+            by default LAYER_CACHE_MAX_OFFSET
+        """
+
+        self.layers = max(1, layers)
+        self.refresh_rate = min(max(0.0, refresh_rate), 1.0)
+        self.max_offset = max(0.0, max_offset)
+        self.hits = 0
+        self.renders = 0
+        self._layers: Dict[LayerKey, List[Layer]] = {}
+        self._lock = Lock()
+
+    def composite(self, generator: Any, image: Image.Image,
+                  box: Tuple[int, int, int, int], num_lines: int,
+                  num_circles: int, min_size: int, max_size: int) -> None:
+        """Composite a decoy layer over an image region, rendering the
+        layers with the generator if needed.
+
+        Parameters
+        ----------
+        generator : CaptchaGenerator
+        image : Image.Image
+        box : Tuple[int, int, int, int]
+            image region (left, top, right, bottom)
+        num_lines : int
+            horizontal lines of the layers
+        num_circles : int
+            circles of the layers
+        min_size : int
+            circles min size
+        max_size : int
+            circles max size
+        """
+
+        if (num_lines <= 0) and (num_circles <= 0):
+            return
+        width = box[2] - box[0]
+        height = box[3] - box[1]
+        key = (width, height, num_lines, num_circles, min_size, max_size)
+        rng = generator.rng
+        with self._lock:
+            layers = self._layers.setdefault(key, [])
+            missing = len(layers) < self.layers
+            if not missing:
+                self.hits += 1
+                layer = layers[rng.randint(0, len(layers) - 1)]
+        if missing or (rng.random() < self.refresh_rate):
+            new_layer = self.render(generator, key)
+            with self._lock:
+                self.renders += 1
+                if len(layers) < self.layers:
+                    layers.append(new_layer)
+                else:
+                    layers[rng.randint(0, len(layers) - 1)] = new_layer
+            if missing:
+                layer = new_layer
+        # Pick a random flip and offset of the layer (the shapes out of the
+        # image are clipped)
+        colors, mask = layer[rng.randint(0, 1)]
+        x = box[0] - rng.randint(0, colors.width - width)
+        y = box[1] - rng.randint(0, colors.height - height)
+        image.paste(colors, (x, y), mask)
+
+    def render(self, generator: Any, key: LayerKey) -> Layer:
+        """Render a decoy layer, bigger than its region to be offset.
+
+        Parameters
+        ----------
+        generator : CaptchaGenerator
+        key : LayerKey
+
+        Returns
+        -------
+        Layer
+        """
+
+        width, height, num_lines, num_circles, min_size, max_size = key
+        size = (
+            width + int(self.max_offset * width),
+            height + int(self.max_offset * height)
+        )
+        # Keep the circles density of the region in the bigger layer
+        num_circles = round(
+            num_circles * (size[0] * size[1]) / max(width * height, 1)
+        )
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        generator.add_rand_overlay_to_image(
+            layer, num_lines, num_circles, min_size, max_size
+        )
+        # Shapes are opaque, so a binary mask (much faster to paste than
+        # an alpha channel) is enough
+        colors = layer.convert("RGB")
+        mask = layer.getchannel("A").convert("1", dither=Image.Dither.NONE)
+        flip = Image.Transpose.FLIP_LEFT_RIGHT
+        return (
+            (colors, mask), (colors.transpose(flip), mask.transpose(flip))
+        )
+
+    def clear(self) -> None:
+        """Remove all the layers."""
+
+        with self._lock:
+            self._layers.clear()
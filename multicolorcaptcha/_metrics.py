@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, List, Sequence
+
+from ._constants import METRICS_BUCKETS
+
+
+class CaptchaMetrics:
+    def __init__(self, buckets: Sequence[float] = METRICS_BUCKETS) -> None:
+        """Metrics sink that collects the number of calls and a duration
+        histogram of each captcha generation stage.
+
+        Parameters
+        ----------
+        buckets : Sequence[float], optional
+            histogram buckets upper limits in seconds,
+            by default METRICS_BUCKETS
+        """
+
+        self.buckets = sorted(buckets)
+        self._stages: Dict[str, List[Any]] = {}
+        self._lock = Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record a stage duration.
+
+        Parameters
+        ----------
+        stage : str
+        seconds : float
+        """
+
+        with self._lock:
+            metric = self._stages.get(stage)
+            if metric is None:
+                # [count, sum, buckets counts (last one is +Inf)]
+                metric = [0, 0.0, [0] * (len(self.buckets) + 1)]
+                self._stages[stage] = metric
+            metric[0] += 1
+            metric[1] += seconds
+            metric[2][bisect_left(self.buckets, seconds)] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the current count, sum and (cumulative) histogram buckets of
+        each stage.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+        """
+
+        snapshot = {}
+        with self._lock:
+            for stage, (count, total, counts) in self._stages.items():
+                cumulative = []
+                accumulated = 0
+                for bucket_count in counts:
+                    accumulated += bucket_count
+                    cumulative.append(accumulated)
+                snapshot[stage] = {
+                    "count": count,
+                    "sum": total,
+                    "buckets": dict(zip(
+                        [str(b) for b in self.buckets] + ["+Inf"], cumulative
+                    ))
+                }
+        return snapshot
+
+    def to_prometheus(self, name: str = "multicolorcaptcha_stage_seconds"
+                      ) -> str:
+        """Export the metrics in Prometheus text exposition format.
+
+        Parameters
+        ----------
+        name : str, optional
+            by default "multicolorcaptcha_stage_seconds"
+
+        Returns
+        -------
+        str
+        """
+
+        lines = [
+            f"# HELP {name} Captcha generation stages duration in seconds.",
+            f"# TYPE {name} histogram"
+        ]
+        for stage, metric in sorted(self.snapshot().items()):
+            for bucket, count in metric["buckets"].items():
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="{bucket}"}} {count}'
+                )
+            lines.append(f'{name}_sum{{stage="{stage}"}} {metric["sum"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {metric["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remove all the recorded metrics."""
+
+        with self._lock:
+            self._stages.clear()
+
+
+class _Stage:
+    __slots__ = ("_sink", "_name", "_start")
+
+    def __init__(self, sink: Any, name: str) -> None:
+        self._sink = sink
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        self._sink.observe(self._name, perf_counter() - self._start)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *_: Any) -> None:
+        pass
+
+
+NO_STAGE = _NoStage()
+
+
+def stage_timer(sink: Any, name: str) -> Any:
+    """Get a context manager that reports to the metrics sink the time spent
+    inside it (it does nothing if there is no sink).
+
+    Parameters
+    ----------
+    sink : Any
+        object with an observe(stage, seconds) method, or None
+    name : str
+
+    Returns
+    -------
+    Any
+    """
+
+    if sink is None:
+        return NO_STAGE
+    return _Stage(sink, name)
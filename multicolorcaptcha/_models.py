@@ -1,15 +1,23 @@
 from dataclasses import dataclass
-from typing import Any
-from PIL import Image
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Union
+
+# PIL is only needed for annotations (so the encoded models can be loaded
+# without it)
+if TYPE_CHECKING:
+    from PIL import Image
 
 
 class __Extended:
+    __slots__ = ()
+
     def __getitem__(self, key: str) -> Any:
         return getattr(self, key)
 
 
 @dataclass
 class RGBModel(__Extended):
+    __slots__ = ("R", "G", "B")
+
     R: int
     G: int
     B: int
@@ -18,21 +26,77 @@ class RGBModel(__Extended):
     def color(self) -> str:
         return f"rgb({self.R}, {self.G}, {self.B})"
 
+    @property
+    def rgb(self) -> Tuple[int, int, int]:
+        return (self.R, self.G, self.B)
+
 
 @dataclass
 class CaptchaCharModel(__Extended):
-    image: Image.Image
+    __slots__ = ("image", "character")
+
+    image: "Image.Image"
     character: str
 
 
 @dataclass
 class CaptchaModel(__Extended):
-    image: Image.Image
+    __slots__ = ("image", "characters")
+
+    image: "Image.Image"
     characters: str
 
 
 @dataclass
 class MathsCaptchaModel(__Extended):
-    image: Image.Image
+    __slots__ = ("image", "equation_str", "equation_result")
+
+    image: "Image.Image"
+    equation_str: str
+    equation_result: str
+
+
+@dataclass
+class EncodedCaptchaModel(__Extended):
+    __slots__ = ("data", "image_format", "characters")
+
+    data: bytes
+    image_format: str
+    characters: str
+
+
+@dataclass
+class EncodedMathsCaptchaModel(__Extended):
+    __slots__ = (
+        "data", "image_format", "equation_str", "equation_result"
+    )
+
+    data: bytes
+    image_format: str
     equation_str: str
     equation_result: str
+
+
+# Any encoded captcha model
+EncodedModel = Union[EncodedCaptchaModel, EncodedMathsCaptchaModel]
+
+
+def captcha_label(captcha: EncodedModel) -> Dict[str, Any]:
+    """Get the answer fields of an encoded captcha (characters, or equation
+    and result).
+
+    Parameters
+    ----------
+    captcha : EncodedModel
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    if isinstance(captcha, EncodedMathsCaptchaModel):
+        return {
+            "equation_str": captcha.equation_str,
+            "equation_result": captcha.equation_result
+        }
+    return {"characters": captcha.characters}
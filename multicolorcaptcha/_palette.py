@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ._constants import (
+    CONTRAST_MIN_RATIO, CONTRAST_BUCKETS, CONTRAST_PALETTE_LEVELS
+)
+
+
+# RGB color components
+RGB = Tuple[int, int, int]
+
+# Linear light value of each sRGB channel value (WCAG 2 formula)
+_LINEAR = [
+    (v / 255) / 12.92 if (v / 255) <= 0.03928
+    else (((v / 255) + 0.055) / 1.055) ** 2.4
+    for v in range(0, 256)
+]
+
+
+def relative_luminance(rgb: Sequence[int]) -> float:
+    """Get the WCAG relative luminance of a color (0 black to 1 white).
+
+    Parameters
+    ----------
+    rgb : Sequence[int]
+
+    Returns
+    -------
+    float
+    """
+
+    return (0.2126 * _LINEAR[rgb[0]] + 0.7152 * _LINEAR[rgb[1]]
+            + 0.0722 * _LINEAR[rgb[2]])
+
+
+def contrast_ratio(luminance_1: float, luminance_2: float) -> float:
+    """Get the WCAG contrast ratio of two luminances (1 to 21).
+
+    Parameters
+    ----------
+    luminance_1 : float
+    luminance_2 : float
+
+    Returns
+    -------
+    float
+    """
+
+    if luminance_1 < luminance_2:
+        luminance_1, luminance_2 = luminance_2, luminance_1
+    return (luminance_1 + 0.05) / (luminance_2 + 0.05)
+
+
+class ContrastPalette:
+    def __init__(self, min_ratio: float = CONTRAST_MIN_RATIO,
+                 buckets: int = CONTRAST_BUCKETS,
+                 levels: int = CONTRAST_PALETTE_LEVELS) -> None:
+        """Precomputed tables of foreground colors with a guaranteed WCAG
+        contrast ratio against the backgrounds of each luminance range, so
+        a contrast color is picked with a single random index draw (and
+        randomly jittered, so the picked colors are not limited to the
+        palette ones).
+
+        Parameters
+        ----------
+        min_ratio : float, optional
+            min contrast ratio of the foreground colors (the most
+            contrasted colors are used for backgrounds where it can't be
+            reached), by default CONTRAST_MIN_RATIO
+        buckets : int, optional
+            number of background luminance ranges,
+            by default CONTRAST_BUCKETS
+        levels : int, optional
+            values of each RGB channel in the foreground palette,
+            by default CONTRAST_PALETTE_LEVELS
+        """
+
+        self.min_ratio = min_ratio
+        self.buckets = max(1, buckets)
+        levels = max(2, levels)
+        # Max jitter of each channel, to cover all the values between the
+        # palette ones
+        self.jitter = round(255 / (levels - 1) / 2)
+        values = [round(i * 255 / (levels - 1)) for i in range(0, levels)]
+        palette = [
+            ((r, g, b), relative_luminance((r, g, b)))
+            for r in values for g in values for b in values
+        ]
+        # Palette indexes sorted by luminance, so the colors contrasted
+        # enough with each luminance range are found by bisection
+        order = sorted(range(0, len(palette)), key=lambda i: palette[i][1])
+        luminances = [palette[i][1] for i in order]
+        self.tables: List[Tuple[RGB, ...]] = []
+        # Min contrast ratio reached by the colors of each table
+        self.ratios: List[float] = []
+        for bucket in range(0, self.buckets):
+            low = bucket / self.buckets
+            high = (bucket + 1) / self.buckets
+            ratio = min_ratio
+            indexes = _contrasted(order, luminances, low, high, ratio)
+            if not indexes:
+                # The best worst case contrast is always reached by the
+                # darkest or the lightest color
+                best = max(_worst_ratio(luminances[0], low, high),
+                           _worst_ratio(luminances[-1], low, high))
+                ratio = best * 0.9
+                indexes = _contrasted(order, luminances, low, high, ratio)
+            self.ratios.append(ratio)
+            self.tables.append(tuple(palette[i][0] for i in sorted(indexes)))
+        # Colors of each table with their max jitter (computed on first use)
+        self._entries: List[Optional[Tuple[Tuple[RGB, int], ...]]] = \
+            [None] * self.buckets
+
+    def colors_for(self, background: Sequence[int]) -> Tuple[RGB, ...]:
+        """Get the foreground colors for a background color.
+
+        Parameters
+        ----------
+        background : Sequence[int]
+
+        Returns
+        -------
+        Tuple[RGB, ...]
+        """
+
+        return self.tables[self._bucket(background)]
+
+    def pick(self, background: Sequence[int], rng: Any) -> RGB:
+        """Get a random foreground color for a background color: a color
+        of its table with each channel randomly jittered, within the
+        jitter bound that keeps the table contrast ratio for that color.
+
+        Parameters
+        ----------
+        background : Sequence[int]
+        rng : Any
+            random numbers source with random module interface
+
+        Returns
+        -------
+        RGB
+        """
+
+        bucket = self._bucket(background)
+        entries = self._entries[bucket]
+        if entries is None:
+            entries = self._jitter_entries(bucket)
+            self._entries[bucket] = entries
+        (r, g, b), bound = rng.choice(entries)
+        if not bound:
+            return (r, g, b)
+        # Jitter of the 3 channels from a single random draw
+        size = 2 * bound + 1
+        jitter = rng.randint(0, size * size * size - 1)
+        jitter, jitter_b = divmod(jitter, size)
+        jitter_r, jitter_g = divmod(jitter, size)
+        return (
+            _reflect(r + jitter_r - bound), _reflect(g + jitter_g - bound),
+            _reflect(b + jitter_b - bound)
+        )
+
+    def _jitter_entries(self, bucket: int
+                        ) -> Tuple[Tuple[RGB, int], ...]:
+        """Get the colors of a table with their max channels jitter that
+        keeps the table contrast ratio (colors that can't be jittered are
+        discarded, unless no color can).
+
+        Parameters
+        ----------
+        bucket : int
+
+        Returns
+        -------
+        Tuple[Tuple[RGB, int], ...]
+        """
+
+        low = bucket / self.buckets
+        high = (bucket + 1) / self.buckets
+        ratio = self.ratios[bucket]
+        entries = []
+        for color in self.tables[bucket]:
+            # Binary search of the max safe jitter (most colors keep the
+            # ratio with the full jitter)
+            min_bound, max_bound = 0, self.jitter
+            if _jitter_keeps_ratio(color, max_bound, low, high, ratio):
+                min_bound = max_bound
+            while min_bound < max_bound:
+                bound = (min_bound + max_bound + 1) // 2
+                if _jitter_keeps_ratio(color, bound, low, high, ratio):
+                    min_bound = bound
+                else:
+                    max_bound = bound - 1
+            entries.append((color, min_bound))
+        jittered = tuple(entry for entry in entries if entry[1] > 0)
+        return jittered or tuple(entries)
+
+    def _bucket(self, background: Sequence[int]) -> int:
+        bucket = int(relative_luminance(background) * self.buckets)
+        return min(bucket, self.buckets - 1)
+
+
+def _reflect(value: int) -> int:
+    # Keep a jittered channel in range without piling values up at the
+    # ends (as clamping would)
+    if value < 0:
+        return -value
+    if value > 255:
+        return 510 - value
+    return value
+
+
+def _worst_ratio(luminance: float, low: float, high: float) -> float:
+    return min(contrast_ratio(luminance, low),
+               contrast_ratio(luminance, high))
+
+
+def _jitter_keeps_ratio(color: RGB, bound: int, low: float, high: float,
+                        ratio: float) -> bool:
+    """Check if a color jittered up to a bound in each channel keeps a
+    worst case contrast ratio against a luminance range.
+
+    Parameters
+    ----------
+    color : RGB
+    bound : int
+    low : float
+    high : float
+    ratio : float
+
+    Returns
+    -------
+    bool
+    """
+
+    # Any color keeps a ratio of 1
+    if ratio <= 1:
+        return True
+    # Luminance grows with each channel, so the jittered luminances are
+    # between the ones of the darkest and lightest jittered colors
+    darkest = relative_luminance([max(v - bound, 0) for v in color])
+    lightest = relative_luminance([min(v + bound, 255) for v in color])
+    # Worst case contrast is 1 at the range limits
+    if (darkest < low < lightest) or (darkest < high < lightest):
+        return False
+    # Out of the range limits, it is min at the jittered luminances ends
+    return ((_worst_ratio(darkest, low, high) >= ratio)
+            and (_worst_ratio(lightest, low, high) >= ratio))
+
+
+def _contrasted(order: List[int], luminances: List[float], low: float,
+                high: float, ratio: float) -> List[int]:
+    """Get the indexes of the colors with a worst case contrast ratio
+    against a luminance range of at least the given one.
+
+    Parameters
+    ----------
+    order : List[int]
+        colors indexes sorted by luminance
+    luminances : List[float]
+        sorted luminances of the colors
+    low : float
+        range min luminance
+    high : float
+        range max luminance
+    ratio : float
+
+    Returns
+    -------
+    List[int]
+    """
+
+    # Colors darker or lighter enough than all the range
+    dark = bisect_right(luminances, (low + 0.05) / ratio - 0.05)
+    light = max(dark, bisect_left(luminances, ratio * (high + 0.05) - 0.05))
+    indexes = order[:dark] + order[light:]
+    # Colors inside the range can only be contrasted enough with both of
+    # its ends for low ratios
+    if (high + 0.05) >= ratio * ratio * (low + 0.05):
+        indexes.extend(
+            order[i] for i in range(dark, light)
+            if _worst_ratio(luminances[i], low, high) >= ratio
+        )
+    return indexes
+
+
+# Process-wide palettes, by min contrast ratio
+_palettes: Dict[float, ContrastPalette] = {}
+_palettes_lock = Lock()
+
+
+def get_contrast_palette(min_ratio: float = CONTRAST_MIN_RATIO
+                         ) -> ContrastPalette:
+    """Get the process-wide contrast palette of a min contrast ratio (it is
+    created on first use).
+
+    Parameters
+    ----------
+    min_ratio : float, optional
+        by default CONTRAST_MIN_RATIO
+
+    Returns
+    -------
+    ContrastPalette
+    """
+
+    palette = _palettes.get(min_ratio)
+    if palette is None:
+        with _palettes_lock:
+            palette = _palettes.get(min_ratio)
+            if palette is None:
+                palette = ContrastPalette(min_ratio)
+                _palettes[min_ratio] = palette
+    return palette
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from multiprocessing import Pool, cpu_count, current_process
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from ._encoder import (
+    encode_captcha, encode_math_captcha, normalize_image_format
+)
+from ._generator import CaptchaGenerator
+from ._random import worker_rng
+from ._models import (
+    EncodedCaptchaModel, EncodedMathsCaptchaModel, EncodedModel
+)
+
+
+# Captcha generator of each worker process
+_worker_generator: Optional[CaptchaGenerator] = None
+
+
+def _init_worker(captcha_size_num: int,
+                 generator_kwargs: Dict[str, Any]) -> None:
+    """Create the worker process captcha generator.
+
+    Parameters
+    ----------
+    captcha_size_num : int
+    generator_kwargs : Dict[str, Any]
+    """
+
+    global _worker_generator
+    # Use an independent random numbers source on each worker
+    if generator_kwargs.get("rng") is not None:
+        identity = current_process()._identity
+        generator_kwargs = dict(generator_kwargs, rng=worker_rng(
+            generator_kwargs["rng"], identity[0] if identity else 0
+        ))
+    _worker_generator = CaptchaGenerator(captcha_size_num, **generator_kwargs)
+
+
+def _gen_batch(math: bool, num_captchas: int,
+               captcha_kwargs: Dict[str, Any]) -> List[Any]:
+    """Generate a batch of captchas with the worker process generator.
+
+    Parameters
+    ----------
+    math : bool
+    num_captchas : int
+    captcha_kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    List[Any]
+    """
+
+    generator = _worker_generator
+    if generator is None:
+        raise RuntimeError("Captcha pool worker not initialized")
+    if math:
+        return generator.gen_math_captcha_batch(  # type: ignore
+            num_captchas, **captcha_kwargs
+        )
+    return generator.gen_captcha_batch(  # type: ignore
+        num_captchas, **captcha_kwargs
+    )
+
+
+def _encode_batch(generator: CaptchaGenerator, math: bool,
+                  num_captchas: int, image_format: str,
+                  encode_options: Dict[str, Any],
+                  captcha_kwargs: Dict[str, Any]) -> List[EncodedModel]:
+    """Generate and encode a batch of captchas with a generator.
+
+    Parameters
+    ----------
+    generator : CaptchaGenerator
+    math : bool
+    num_captchas : int
+    image_format : str
+    encode_options : Dict[str, Any]
+    captcha_kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    List[EncodedModel]
+    """
+
+    if math:
+        captchas = generator.gen_math_captcha_batch(
+            num_captchas, **captcha_kwargs
+        )
+    else:
+        captchas = generator.gen_captcha_batch(  # type: ignore
+            num_captchas, **captcha_kwargs
+        )
+    encode = encode_math_captcha if math else encode_captcha
+    encoded = []
+    for captcha in captchas:
+        encoded.append(encode(captcha, image_format, **encode_options))
+        # Recycle the captcha image (if the buffer pool is enabled)
+        generator.release(captcha)
+    return encoded
+
+
+def _gen_encoded_batch(math: bool, num_captchas: int, image_format: str,
+                       encode_options: Dict[str, Any],
+                       captcha_kwargs: Dict[str, Any]) -> List[EncodedModel]:
+    """Generate and encode a batch of captchas in the worker process.
+
+    Parameters
+    ----------
+    math : bool
+    num_captchas : int
+    image_format : str
+    encode_options : Dict[str, Any]
+    captcha_kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    List[EncodedModel]
+    """
+
+    generator = _worker_generator
+    if generator is None:
+        raise RuntimeError("Captcha pool worker not initialized")
+    return _encode_batch(
+        generator, math, num_captchas, image_format, encode_options,
+        captcha_kwargs
+    )
+
+
+def _imap_tasks(submit: Callable[[int], Any],
+                result: Callable[[Any], List[EncodedModel]],
+                num_captchas: int, chunk_size: int,
+                max_pending: int) -> Iterator[EncodedModel]:
+    """Submit the generation tasks of chunks of captchas keeping a bounded
+    number of them on the fly, and yield the results in order.
+
+    Parameters
+    ----------
+    submit : Callable[[int], Any]
+        submit the task of a number of captchas, returning its handle
+    result : Callable[[Any], List[EncodedModel]]
+        wait for a task handle result
+    num_captchas : int
+    chunk_size : int
+    max_pending : int
+
+    Returns
+    -------
+    Iterator[EncodedModel]
+    """
+
+    chunk_size = max(1, chunk_size)
+    max_pending = max(1, max_pending)
+    pending: Deque[Any] = deque()
+    remaining = num_captchas
+    while (remaining > 0) or pending:
+        # Keep workers busy with up to max_pending tasks
+        while (remaining > 0) and (len(pending) < max_pending):
+            num = min(chunk_size, remaining)
+            remaining -= num
+            pending.append(submit(num))
+        for captcha in result(pending.popleft()):
+            yield captcha
+
+
+class CaptchaPool:
+    def __init__(self, captcha_size_num: int = 2,
+                 processes: Optional[int] = None,
+                 image_format: str = "png", preload_fonts: bool = False,
+                 generator_kwargs: Optional[Dict[str, Any]] = None,
+                 encode_options: Optional[Dict[str, Any]] = None
+                 ) -> None:
+        """Pool of worker processes, each one with its own captcha
+        generator, that generates encoded captchas in parallel.
+
+        Parameters
+        ----------
+        captcha_size_num : int, optional
+            by default 2
+        processes : int, optional
+            number of worker processes, by default the number of CPUs
+        image_format : str, optional
+            by default "png"
+        preload_fonts : bool, optional
+            load all the fonts in each worker before starting,
+            by default False
+        generator_kwargs : Dict[str, Any], optional
+            extra arguments for the workers CaptchaGenerator,
+            by default None
+        encode_options : Dict[str, Any], optional
+            encode_image() options (compress_level, quality, quantize),
+            by default None
+        """
+
+        if processes is None:
+            processes = cpu_count()
+        self.processes = max(1, processes)
+        self.image_format = normalize_image_format(image_format)
+        self.encode_options = dict(encode_options or {})
+        generator_kwargs = dict(generator_kwargs or {})
+        generator_kwargs.setdefault("preload_fonts", preload_fonts)
+        # Fail early if the workers random sources can't be derived
+        worker_rng(generator_kwargs.get("rng"), 0)
+        self._pool = Pool(
+            self.processes, _init_worker,
+            (captcha_size_num, generator_kwargs)
+        )
+
+    def __enter__(self) -> "CaptchaPool":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def imap_captchas(self, num_captchas: int, chunk_size: int = 8,
+                      max_pending: Optional[int] = None,
+                      **captcha_kwargs: Any) -> Iterator[EncodedCaptchaModel]:
+        """Generate captchas in the worker processes, yielding them as soon
+        as they are ready (gen_captcha_image() arguments are accepted).
+
+        Parameters
+        ----------
+        num_captchas : int
+        chunk_size : int, optional
+            captchas generated by each worker task, by default 8
+        max_pending : int, optional
+            max number of tasks on the fly, by default twice the number of
+            processes
+
+        Returns
+        -------
+        Iterator[EncodedCaptchaModel]
+        """
+
+        return self._imap(  # type: ignore
+            False, num_captchas, chunk_size, max_pending, captcha_kwargs
+        )
+
+    def imap_math_captchas(self, num_captchas: int, chunk_size: int = 8,
+                           max_pending: Optional[int] = None,
+                           **captcha_kwargs: Any
+                           ) -> Iterator[EncodedMathsCaptchaModel]:
+        """Generate math captchas in the worker processes, yielding them as
+        soon as they are ready (gen_math_captcha_image() arguments are
+        accepted).
+
+        Parameters
+        ----------
+        num_captchas : int
+        chunk_size : int, optional
+            captchas generated by each worker task, by default 8
+        max_pending : int, optional
+            max number of tasks on the fly, by default twice the number of
+            processes
+
+        Returns
+        -------
+        Iterator[EncodedMathsCaptchaModel]
+        """
+
+        return self._imap(  # type: ignore
+            True, num_captchas, chunk_size, max_pending, captcha_kwargs
+        )
+
+    def _imap(self, math: bool, num_captchas: int, chunk_size: int,
+              max_pending: Optional[int], captcha_kwargs: Dict[str, Any]
+              ) -> Iterator[EncodedModel]:
+        """Submit the generation tasks keeping a bounded number of them on
+        the fly, and yield the results in order.
+
+        Parameters
+        ----------
+        math : bool
+        num_captchas : int
+        chunk_size : int
+        max_pending : int, optional
+        captcha_kwargs : Dict[str, Any]
+
+        Returns
+        -------
+        Iterator[EncodedModel]
+        """
+
+        if max_pending is None:
+            max_pending = 2 * self.processes
+        return _imap_tasks(
+            lambda num: self._pool.apply_async(_gen_encoded_batch, (
+                math, num, self.image_format, self.encode_options,
+                captcha_kwargs
+            )),
+            lambda task: task.get(), num_captchas, chunk_size, max_pending
+        )
+
+    def close(self) -> None:
+        """Wait for the pending tasks and stop the worker processes."""
+
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self) -> None:
+        """Stop the worker processes immediately."""
+
+        self._pool.terminate()
+        self._pool.join()
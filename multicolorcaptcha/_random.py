@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+import random
+import sys
+from threading import Lock
+from typing import Any, List, Sequence
+
+from ._constants import NUMPY_NOISE_MIN_PIXELS, RNG_BUFFER_SIZE
+
+
+class NumpyRandom:
+    def __init__(self, generator: Any,
+                 buffer_size: int = RNG_BUFFER_SIZE) -> None:
+        """Random numbers source with the random module interface used by
+        the captcha generator, backed by a numpy Generator. Random values
+        are drawn from the numpy generator in bulk and served one by one.
+
+        Parameters
+        ----------
+        generator : numpy.random.Generator
+        buffer_size : int, optional
+            values drawn on each bulk draw, by default RNG_BUFFER_SIZE
+        """
+
+        self.generator = generator
+        self.buffer_size = max(1, buffer_size)
+        self._buffer: List[float] = []
+        self._lock = Lock()
+
+    def random(self) -> float:
+        """Get a random float in the range [0, 1).
+
+        Returns
+        -------
+        float
+        """
+
+        try:
+            return self._buffer.pop()
+        except IndexError:
+            pass
+        with self._lock:
+            if not self._buffer:
+                self._buffer = self.generator.random(
+                    self.buffer_size
+                ).tolist()
+            return self._buffer.pop()
+
+    def randint(self, a: int, b: int) -> int:
+        """Get a random integer in the range [a, b] (both included).
+
+        Parameters
+        ----------
+        a : int
+        b : int
+
+        Returns
+        -------
+        int
+        """
+
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq: Sequence[Any]) -> Any:
+        """Get a random element of a non-empty sequence.
+
+        Parameters
+        ----------
+        seq : Sequence[Any]
+
+        Returns
+        -------
+        Any
+        """
+
+        return seq[int(self.random() * len(seq))]
+
+    def choices(self, population: Sequence[Any], k: int = 1) -> List[Any]:
+        """Get k random elements (with replacement) of a sequence.
+
+        Parameters
+        ----------
+        population : Sequence[Any]
+        k : int, optional
+            by default 1
+
+        Returns
+        -------
+        List[Any]
+        """
+
+        with self._lock:
+            indexes = self.generator.integers(0, len(population), k)
+        return [population[i] for i in indexes.tolist()]
+
+
+# numpy module once imported (False if it is not installed)
+_numpy: Any = None
+
+
+def import_numpy() -> Any:
+    """Get the numpy module, imported on first use (it is an optional
+    dependency, slow to import for short-lived workers).
+
+    Returns
+    -------
+    module or None
+        numpy, or None if it is not installed
+    """
+
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def bulk_numpy(rng: Any, num_values: int = 0) -> Any:
+    """Get the numpy module for bulk random draws only if it is already
+    imported, the random numbers source is numpy based or the number of
+    values to draw is worth the numpy import time.
+
+    Parameters
+    ----------
+    rng : Any
+        random numbers source
+    num_values : int, optional
+        number of values to draw, by default 0
+
+    Returns
+    -------
+    module or None
+        numpy, or None if the draws should be done one by one
+    """
+
+    if (isinstance(rng, NumpyRandom) or ("numpy" in sys.modules)
+            or (num_values >= NUMPY_NOISE_MIN_PIXELS)):
+        return import_numpy()
+    return None
+
+
+def worker_rng(rng: Any, identity: int) -> Any:
+    """Get the random numbers source of a worker process from the one
+    provided to a process pool (each worker gets a copy of it, so it would
+    generate the same captchas as the other workers): an int seed is
+    offset, a random.Random is reseeded and a numpy Generator is jumped by
+    the worker identity.
+
+    Parameters
+    ----------
+    rng : Any
+        random numbers source provided to the pool
+    identity : int
+        worker number
+
+    Returns
+    -------
+    Any
+
+    Raises
+    ------
+    ValueError
+        if independent sources can't be derived from the provided one
+    """
+
+    if rng is None:
+        # The random module is reseeded on each new process
+        return None
+    if isinstance(rng, int):
+        return rng + identity
+    if isinstance(rng, random.Random):
+        return random.Random(f"{rng.getrandbits(64)}:{identity}")
+    if isinstance(rng, NumpyRandom):
+        rng = rng.generator
+    bit_generator = getattr(rng, "bit_generator", None)
+    if hasattr(bit_generator, "jumped"):
+        return type(rng)(bit_generator.jumped(identity))  # type: ignore
+    raise ValueError(
+        "Process pools random numbers source must be an int seed, a "
+        "random.Random or a numpy Generator with a jumpable bit generator"
+    )
+
+
+def make_rng(rng: Any = None) -> Any:
+    """Get the random numbers source to use from the provided one: None
+    (random module global generator), an int seed, a random.Random
+    instance, a numpy Generator or any object with the random module
+    randint(), choice(), choices() and random() functions.
+
+    Parameters
+    ----------
+    rng : Any, optional
+        by default None
+
+    Returns
+    -------
+    Any
+    """
+
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    # numpy Generator (without importing numpy)
+    if hasattr(rng, "integers") and hasattr(rng, "bit_generator"):
+        return NumpyRandom(rng)
+    return rng
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from threading import Condition, Lock, Thread
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from ._generator import CaptchaGenerator
+from ._pool import CaptchaPool
+
+
+# (math captcha, sorted generation arguments)
+ConfigKey = Tuple[bool, Tuple[Tuple[str, Any], ...]]
+
+
+class CaptchaReservoir:
+    def __init__(self, captcha_size_num: int = 2, target_size: int = 64,
+                 low_watermark: Optional[int] = None,
+                 refill_threads: int = 1, refill_batch: int = 8,
+                 generator: Optional[CaptchaGenerator] = None,
+                 pool: Optional[CaptchaPool] = None) -> None:
+        """Store of pre-generated captchas for each generation
+        configuration, refilled in background threads when it drops below
+        a low-watermark. Each captcha is handed out just once.
+
+        Parameters
+        ----------
+        captcha_size_num : int, optional
+            by default 2
+        target_size : int, optional
+            number of captchas to keep for each configuration,
+            by default 64
+        low_watermark : int, optional
+            number of captchas that starts a refill, by default half of
+            target_size
+        refill_threads : int, optional
+            by default 1
+        refill_batch : int, optional
+            captchas generated on each refill step, by default 8
+        generator : CaptchaGenerator, optional
+            generator to use, by default a new one of captcha_size_num
+        pool : CaptchaPool, optional
+            generate the captchas in this pool worker processes (encoded
+            captchas are stored then), by default None
+        """
+
+        self.target_size = max(1, target_size)
+        if low_watermark is None:
+            low_watermark = self.target_size // 2
+        self.low_watermark = min(max(0, low_watermark), self.target_size)
+        self.refill_batch = max(1, refill_batch)
+        self.pool = pool
+        self.generator = generator
+        if (generator is None) and (pool is None):
+            self.generator = CaptchaGenerator(captcha_size_num)
+        self.hits = 0
+        self.misses = 0
+        self.refilled = 0
+        self.refill_seconds = 0.0
+        self.last_error: Optional[BaseException] = None
+        self._queues: Dict[ConfigKey, Deque[Any]] = {}
+        self._filling: Set[ConfigKey] = set()
+        self._refilling: Set[ConfigKey] = set()
+        self._closed = False
+        self._lock = Lock()
+        self._refill_needed = Condition(self._lock)
+        self._threads: List[Thread] = []
+        for _ in range(0, max(1, refill_threads)):
+            thread = Thread(target=self._refill_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self) -> "CaptchaReservoir":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    @property
+    def refill_rate(self) -> float:
+        """Captchas generated per second of refill work."""
+
+        if self.refill_seconds <= 0:
+            return 0.0
+        return self.refilled / self.refill_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the reservoir counters.
+
+        Returns
+        -------
+        Dict[str, Any]
+        """
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refilled": self.refilled,
+                "refill_rate": self.refill_rate,
+                "available": sum(len(q) for q in self._queues.values())
+            }
+
+    def add_config(self, math: bool = False, **captcha_kwargs: Any) -> None:
+        """Register a generation configuration to start filling it in the
+        background (gen_captcha_image() or gen_math_captcha_image()
+        arguments are accepted).
+
+        Parameters
+        ----------
+        math : bool, optional
+            by default False
+        """
+
+        key = self._config_key(math, captcha_kwargs)
+        with self._lock:
+            self._register(key)
+
+    def get_captcha(self, **captcha_kwargs: Any) -> Any:
+        """Get a captcha of the given configuration (gen_captcha_image()
+        arguments are accepted), generating it if there is none available.
+
+        Returns
+        -------
+        Any
+            CaptchaModel (or EncodedCaptchaModel if a pool is used)
+        """
+
+        return self._get(False, captcha_kwargs)
+
+    def get_math_captcha(self, **captcha_kwargs: Any) -> Any:
+        """Get a math captcha of the given configuration
+        (gen_math_captcha_image() arguments are accepted), generating it if
+        there is none available.
+
+        Returns
+        -------
+        Any
+            MathsCaptchaModel (or EncodedMathsCaptchaModel if a pool is used)
+        """
+
+        return self._get(True, captcha_kwargs)
+
+    def close(self) -> None:
+        """Stop the refill threads."""
+
+        with self._lock:
+            self._closed = True
+            self._refill_needed.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    @staticmethod
+    def _config_key(math: bool, captcha_kwargs: Dict[str, Any]
+                    ) -> ConfigKey:
+        return (math, tuple(sorted(captcha_kwargs.items())))
+
+    def _register(self, key: ConfigKey) -> Deque[Any]:
+        """Add a configuration queue if it doesn't exist (lock must be
+        held).
+
+        Parameters
+        ----------
+        key : ConfigKey
+
+        Returns
+        -------
+        Deque[Any]
+        """
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = deque()
+            self._queues[key] = queue
+            self._filling.add(key)
+            self._refill_needed.notify()
+        return queue
+
+    def _get(self, math: bool, captcha_kwargs: Dict[str, Any]) -> Any:
+        key = self._config_key(math, captcha_kwargs)
+        captcha = None
+        with self._lock:
+            queue = self._register(key)
+            if queue:
+                captcha = queue.popleft()
+                self.hits += 1
+            else:
+                self.misses += 1
+            if (len(queue) < self.low_watermark) or (not queue):
+                self._filling.add(key)
+                self._refill_needed.notify()
+        if captcha is None:
+            captcha = self._generate(key, 1)[0]
+        return captcha
+
+    def _generate(self, key: ConfigKey, num_captchas: int) -> List[Any]:
+        """Generate captchas of the given configuration.
+
+        Parameters
+        ----------
+        key : ConfigKey
+        num_captchas : int
+
+        Returns
+        -------
+        List[Any]
+        """
+
+        math, kwargs = key[0], dict(key[1])
+        if self.pool is not None:
+            if math:
+                return list(self.pool.imap_math_captchas(
+                    num_captchas, chunk_size=num_captchas, **kwargs
+                ))
+            return list(self.pool.imap_captchas(
+                num_captchas, chunk_size=num_captchas, **kwargs
+            ))
+        if math:
+            return self.generator.gen_math_captcha_batch(  # type: ignore
+                num_captchas, **kwargs
+            )
+        return self.generator.gen_captcha_batch(  # type: ignore
+            num_captchas, **kwargs
+        )
+
+    def _next_refill(self) -> Optional[ConfigKey]:
+        """Get next configuration to refill, if any (lock must be held).
+
+        Returns
+        -------
+        Optional[ConfigKey]
+        """
+
+        for key in list(self._filling):
+            if len(self._queues[key]) >= self.target_size:
+                self._filling.discard(key)
+            elif key not in self._refilling:
+                return key
+        return None
+
+    def _refill_loop(self) -> None:
+        while True:
+            with self._lock:
+                key = self._next_refill()
+                while (not self._closed) and (key is None):
+                    self._refill_needed.wait()
+                    key = self._next_refill()
+                if self._closed:
+                    return
+                self._refilling.add(key)  # type: ignore
+                num_captchas = min(
+                    self.refill_batch,
+                    self.target_size - len(self._queues[key])  # type: ignore
+                )
+            captchas: List[Any] = []
+            time_start = perf_counter()
+            try:
+                captchas = self._generate(key, num_captchas)  # type: ignore
+            except Exception as error:
+                self.last_error = error
+            elapsed = perf_counter() - time_start
+            with self._lock:
+                self._refilling.discard(key)  # type: ignore
+                if not captchas:
+                    # Stop refilling a failing configuration
+                    self._filling.discard(key)  # type: ignore
+                self._queues[key].extend(captchas)  # type: ignore
+                self.refilled += len(captchas)
+                self.refill_seconds += elapsed
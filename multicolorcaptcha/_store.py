@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+import json
+import mmap
+from contextlib import contextmanager
+from struct import Struct
+from threading import Lock
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from ._models import (
+    EncodedCaptchaModel, EncodedMathsCaptchaModel, EncodedModel,
+    captcha_label
+)
+
+
+# Store file identifier and format version
+STORE_MAGIC = b"MCCSTORE"
+STORE_VERSION = 1
+
+# File header (magic, version, entries capacity, data region size,
+# number of stored entries, number of claimed entries, data region used)
+HEADER = Struct("<8sIIQQQQ")
+
+# Index entry (data offset, image size, label size)
+INDEX_ENTRY = Struct("<QII")
+
+
+class CaptchaStore:
+    def __init__(self, file_path: str) -> None:
+        """Store of encoded captchas in a memory-mapped file, that can be
+        shared by several processes. The file has a fixed size header, an
+        index of entries offsets and a data region with the encoded images
+        and their JSON labels. Captchas are read without copies (their data
+        is a memoryview of the file mapping) and each one is claimed just
+        once across all processes using the store.
+
+        Parameters
+        ----------
+        file_path : str
+            store file, created with CaptchaStore.create()
+        """
+
+        self.file_path = file_path
+        self._file = open(file_path, "r+b")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+        self._lock = Lock()
+        header = None
+        if len(self._mmap) >= HEADER.size:
+            header = HEADER.unpack_from(self._mmap, 0)
+        if (header is None) or (header[0] != STORE_MAGIC) or \
+                (header[1] != STORE_VERSION):
+            self.close()
+            raise ValueError(f"Invalid captcha store file: {file_path}")
+        self.capacity = header[2]
+        self.data_size = header[3]
+        self.data_start = HEADER.size + (self.capacity * INDEX_ENTRY.size)
+
+    @classmethod
+    def create(cls, file_path: str, capacity: int,
+               data_size: int) -> "CaptchaStore":
+        """Create an empty store file (any existing one is overwritten).
+
+        Parameters
+        ----------
+        file_path : str
+        capacity : int
+            max number of captchas
+        data_size : int
+            size of the data region (encoded images and labels), in bytes
+
+        Returns
+        -------
+        CaptchaStore
+        """
+
+        capacity = max(1, capacity)
+        data_size = max(1, data_size)
+        with open(file_path, "wb") as f:
+            f.write(HEADER.pack(
+                STORE_MAGIC, STORE_VERSION, capacity, data_size, 0, 0, 0
+            ))
+            f.truncate(HEADER.size + (capacity * INDEX_ENTRY.size)
+                       + data_size)
+        return cls(file_path)
+
+    def __enter__(self) -> "CaptchaStore":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._header()[4]
+
+    @property
+    def available(self) -> int:
+        """Number of stored captchas not claimed yet."""
+
+        header = self._header()
+        return header[4] - header[5]
+
+    def append(self, captcha: EncodedModel) -> bool:
+        """Add an encoded captcha to the store.
+
+        Parameters
+        ----------
+        captcha : EncodedModel
+
+        Returns
+        -------
+        bool
+            False if the store is full
+        """
+
+        label = json.dumps(dict(
+            captcha_label(captcha), image_format=captcha.image_format
+        )).encode()
+        image_size = len(captcha.data)
+        with self._locked():
+            _, _, _, _, count, claimed, data_end = self._header()
+            if (count >= self.capacity) or \
+                    (data_end + image_size + len(label) > self.data_size):
+                return False
+            offset = self.data_start + data_end
+            self._view[offset:offset + image_size] = captcha.data
+            self._view[offset + image_size:
+                       offset + image_size + len(label)] = label
+            INDEX_ENTRY.pack_into(
+                self._mmap, HEADER.size + (count * INDEX_ENTRY.size),
+                offset, image_size, len(label)
+            )
+            self._set_header(
+                count + 1, claimed, data_end + image_size + len(label)
+            )
+        return True
+
+    def extend(self, captchas: Iterable[EncodedModel]) -> int:
+        """Add encoded captchas to the store until it is full.
+
+        Parameters
+        ----------
+        captchas : Iterable[EncodedModel]
+
+        Returns
+        -------
+        int
+            number of added captchas
+        """
+
+        added = 0
+        for captcha in captchas:
+            if not self.append(captcha):
+                break
+            added += 1
+        return added
+
+    def claim(self) -> Optional[EncodedModel]:
+        """Take the next not claimed captcha of the store (no other process
+        or thread gets it). Its data is a memoryview of the file mapping.
+
+        Returns
+        -------
+        Optional[EncodedModel]
+            None if there is no captcha available
+        """
+
+        with self._locked():
+            header = self._header()
+            count, claimed = header[4], header[5]
+            if claimed >= count:
+                return None
+            self._set_header(count, claimed + 1, header[6])
+        return self.get(claimed)
+
+    def get(self, index: int) -> EncodedModel:
+        """Read a stored captcha (claimed or not). Its data is a
+        memoryview of the file mapping.
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        EncodedModel
+        """
+
+        if not 0 <= index < len(self):
+            raise IndexError("Captcha store index out of range")
+        offset, image_size, label_size = INDEX_ENTRY.unpack_from(
+            self._mmap, HEADER.size + (index * INDEX_ENTRY.size)
+        )
+        label = json.loads(bytes(
+            self._view[offset + image_size:offset + image_size + label_size]
+        ))
+        data = self._view[offset:offset + image_size]
+        if "equation_str" in label:
+            return EncodedMathsCaptchaModel(
+                data, label["image_format"],  # type: ignore
+                label["equation_str"], label["equation_result"]
+            )
+        return EncodedCaptchaModel(
+            data, label["image_format"], label["characters"]  # type: ignore
+        )
+
+    def __iter__(self) -> Iterator[EncodedModel]:
+        for index in range(0, len(self)):
+            yield self.get(index)
+
+    def close(self) -> None:
+        """Close the store file. The mapping is released when no captcha
+        data memoryview is in use anymore."""
+
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # Captchas data still reference the mapping
+            pass
+        self._file.close()
+
+    def _header(self) -> Tuple[Any, ...]:
+        return HEADER.unpack_from(self._mmap, 0)
+
+    def _set_header(self, count: int, claimed: int, data_end: int) -> None:
+        HEADER.pack_into(
+            self._mmap, 0, STORE_MAGIC, STORE_VERSION, self.capacity,
+            self.data_size, count, claimed, data_end
+        )
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Lock the store for the current thread and (if supported by the
+        system) for other processes."""
+
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
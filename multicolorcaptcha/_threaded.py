@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from typing import Any, Dict, Iterator, Optional
+
+from ._encoder import normalize_image_format
+from ._generator import CaptchaGenerator
+from ._models import (
+    EncodedCaptchaModel, EncodedMathsCaptchaModel, EncodedModel
+)
+from ._pool import _encode_batch, _imap_tasks
+
+
+class CaptchaThreadPool:
+    def __init__(self, captcha_size_num: int = 2,
+                 threads: Optional[int] = None, image_format: str = "png",
+                 generator: Optional[CaptchaGenerator] = None,
+                 encode_options: Optional[Dict[str, Any]] = None) -> None:
+        """Pool of threads that share a single captcha generator and
+        generate encoded captchas in parallel, without the memory cost of
+        worker processes. Pillow releases the GIL in its image operations
+        (rotate, paste, fill and encoding) but not in text rasterization,
+        so the default generator uses the glyph atlas: once its glyphs are
+        rasterized, characters are drawn with GIL-free pastes. The Python
+        code of each captcha (random draws, shapes geometry) still holds
+        the GIL (with free-threaded Python builds, the full pipeline runs
+        in parallel).
+
+        Parameters
+        ----------
+        captcha_size_num : int, optional
+            by default 2
+        threads : int, optional
+            number of threads, by default the number of CPUs
+        image_format : str, optional
+            by default "png"
+        generator : CaptchaGenerator, optional
+            generator to share between threads, by default a new one of
+            captcha_size_num with glyph atlas
+        encode_options : Dict[str, Any], optional
+            encode_image() options (compress_level, quality, quantize),
+            by default None
+        """
+
+        if threads is None:
+            threads = cpu_count() or 1
+        self.threads = max(1, threads)
+        self.image_format = normalize_image_format(image_format)
+        self.encode_options = dict(encode_options or {})
+        if generator is None:
+            generator = CaptchaGenerator(captcha_size_num, glyph_atlas=True)
+        self.generator = generator
+        self._executor = ThreadPoolExecutor(
+            self.threads, thread_name_prefix="captcha"
+        )
+
+    def __enter__(self) -> "CaptchaThreadPool":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def imap_captchas(self, num_captchas: int, chunk_size: int = 4,
+                      max_pending: Optional[int] = None,
+                      **captcha_kwargs: Any) -> Iterator[EncodedCaptchaModel]:
+        """Generate captchas in the pool threads, yielding them as soon as
+        they are ready (gen_captcha_image() arguments are accepted).
+
+        Parameters
+        ----------
+        num_captchas : int
+        chunk_size : int, optional
+            captchas generated by each thread task, by default 4
+        max_pending : int, optional
+            max number of tasks on the fly, by default twice the number of
+            threads
+
+        Returns
+        -------
+        Iterator[EncodedCaptchaModel]
+        """
+
+        return self._imap(  # type: ignore
+            False, num_captchas, chunk_size, max_pending, captcha_kwargs
+        )
+
+    def imap_math_captchas(self, num_captchas: int, chunk_size: int = 4,
+                           max_pending: Optional[int] = None,
+                           **captcha_kwargs: Any
+                           ) -> Iterator[EncodedMathsCaptchaModel]:
+        """Generate math captchas in the pool threads, yielding them as soon
+        as they are ready (gen_math_captcha_image() arguments are
+        accepted).
+
+        Parameters
+        ----------
+        num_captchas : int
+        chunk_size : int, optional
+            captchas generated by each thread task, by default 4
+        max_pending : int, optional
+            max number of tasks on the fly, by default twice the number of
+            threads
+
+        Returns
+        -------
+        Iterator[EncodedMathsCaptchaModel]
+        """
+
+        return self._imap(  # type: ignore
+            True, num_captchas, chunk_size, max_pending, captcha_kwargs
+        )
+
+    def _imap(self, math: bool, num_captchas: int, chunk_size: int,
+              max_pending: Optional[int], captcha_kwargs: Dict[str, Any]
+              ) -> Iterator[EncodedModel]:
+        """Submit the generation tasks keeping a bounded number of them on
+        the fly, and yield the results in order.
+
+        Parameters
+        ----------
+        math : bool
+        num_captchas : int
+        chunk_size : int
+        max_pending : int, optional
+        captcha_kwargs : Dict[str, Any]
+
+        Returns
+        -------
+        Iterator[EncodedModel]
+        """
+
+        if max_pending is None:
+            max_pending = 2 * self.threads
+        return _imap_tasks(
+            lambda num: self._executor.submit(
+                _encode_batch, self.generator, math, num, self.image_format,
+                self.encode_options, captcha_kwargs
+            ),
+            lambda task: task.result(), num_captchas, chunk_size,
+            max_pending
+        )
+
+    def close(self) -> None:
+        """Wait for the pending tasks and stop the threads."""
+
+        self._executor.shutdown(wait=True)
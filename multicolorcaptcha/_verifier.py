@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from hmac import compare_digest
+from secrets import token_urlsafe
+from threading import Lock
+from time import monotonic
+from typing import Any, Optional
+
+from ._constants import VERIFIER_ID_BYTES, VERIFIER_TTL
+
+
+class _Answer:
+    # Slots instead of instance dict to keep millions of answers compact
+    __slots__ = ("answer", "expires", "ignore_case")
+
+    def __init__(self, answer: bytes, expires: float,
+                 ignore_case: bool) -> None:
+        self.answer = answer
+        self.expires = expires
+        self.ignore_case = ignore_case
+
+
+class CaptchaVerifier:
+    def __init__(self, ttl: float = VERIFIER_TTL,
+                 case_sensitive: bool = True,
+                 max_entries: Optional[int] = None) -> None:
+        """Store of the outstanding captchas answers, keyed by a random
+        captcha ID. Each answer can be verified just once (a wrong answer
+        also consumes it) and expires after a time to live. Answers are
+        compared in constant time (it is thread-safe).
+
+        Parameters
+        ----------
+        ttl : float, optional
+            seconds to expire an answer, by default VERIFIER_TTL
+        case_sensitive : bool, optional
+            default answers matching mode, by default True
+        max_entries : int, optional
+            max number of outstanding answers (the oldest are discarded),
+            by default no limit
+        """
+
+        self.ttl = ttl
+        self.case_sensitive = case_sensitive
+        self.max_entries = max_entries
+        self.verified = 0
+        self.failed = 0
+        self.expired = 0
+        self._answers: "OrderedDict[str, _Answer]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def __contains__(self, captcha_id: str) -> bool:
+        with self._lock:
+            answer = self._answers.get(captcha_id)
+            return (answer is not None) and (answer.expires > monotonic())
+
+    def add(self, captcha: Any, captcha_id: Optional[str] = None,
+            case_sensitive: Optional[bool] = None) -> str:
+        """Add the answer of a captcha to be verified.
+
+        Parameters
+        ----------
+        captcha : Any
+            captcha model (standard or math, image or encoded) or its
+            answer string
+        captcha_id : str, optional
+            by default a new random ID
+        case_sensitive : bool, optional
+            by default the verifier matching mode (case insensitive
+            matching is intended for "hex" and "ascii" chars modes)
+
+        Returns
+        -------
+        str
+            captcha ID
+        """
+
+        if isinstance(captcha, str):
+            answer = captcha
+        elif hasattr(captcha, "equation_result"):
+            answer = captcha.equation_result
+        else:
+            answer = captcha.characters
+        if case_sensitive is None:
+            case_sensitive = self.case_sensitive
+        if captcha_id is None:
+            captcha_id = token_urlsafe(VERIFIER_ID_BYTES)
+        record = _Answer(
+            self._normalize(answer, not case_sensitive),
+            monotonic() + self.ttl, not case_sensitive
+        )
+        with self._lock:
+            self._purge_expired()
+            self._answers.pop(captcha_id, None)
+            self._answers[captcha_id] = record
+            if self.max_entries is not None:
+                while len(self._answers) > max(1, self.max_entries):
+                    self._answers.popitem(last=False)
+        return captcha_id
+
+    def verify(self, captcha_id: str, answer: str) -> bool:
+        """Check the answer of a captcha, consuming it.
+
+        Parameters
+        ----------
+        captcha_id : str
+        answer : str
+
+        Returns
+        -------
+        bool
+            False if the answer is wrong, or the captcha is unknown,
+            expired or already verified
+        """
+
+        with self._lock:
+            record = self._answers.pop(captcha_id, None)
+            if record is None:
+                self.failed += 1
+                return False
+            if record.expires <= monotonic():
+                self.expired += 1
+                self.failed += 1
+                return False
+        valid = compare_digest(
+            self._normalize(answer, record.ignore_case), record.answer
+        )
+        with self._lock:
+            if valid:
+                self.verified += 1
+            else:
+                self.failed += 1
+        return valid
+
+    def purge(self) -> int:
+        """Remove the expired answers.
+
+        Returns
+        -------
+        int
+            number of removed answers
+        """
+
+        with self._lock:
+            return self._purge_expired()
+
+    def clear(self) -> None:
+        """Remove all the answers."""
+
+        with self._lock:
+            self._answers.clear()
+
+    @staticmethod
+    def _normalize(answer: str, ignore_case: bool) -> bytes:
+        answer = str(answer).strip()
+        if ignore_case:
+            answer = answer.casefold()
+        return answer.encode("utf-8")
+
+    def _purge_expired(self) -> int:
+        """Remove the expired answers (lock must be held). Answers are
+        kept in insertion order and share the same time to live, so just
+        the oldest ones need to be checked.
+
+        Returns
+        -------
+        int
+        """
+
+        now = monotonic()
+        removed = 0
+        while self._answers:
+            captcha_id, record = next(iter(self._answers.items()))
+            if record.expires > now:
+                break
+            del self._answers[captcha_id]
+            removed += 1
+        self.expired += removed
+        return removed
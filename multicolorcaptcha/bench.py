@@ -0,0 +1,595 @@
+# -*- coding: utf-8 -*-
+
+"""Captcha generation benchmark.
+
+Usage: python -m multicolorcaptcha.bench [options] [-o results.json]
+       python -m multicolorcaptcha.bench --threads 1,2,4,8 [options]
+       python -m multicolorcaptcha.bench --memory [options]
+       python -m multicolorcaptcha.bench --startup [options]
+"""
+
+import json
+import platform
+import sys
+from argparse import ArgumentParser
+from itertools import product
+from multiprocessing import get_context
+from os import cpu_count, path
+from subprocess import run
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import PIL
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from . import __version__
+from ._buffers import BufferPool
+from ._constants import (
+    BUFFER_POOL_MAX_IMAGES, CAPTCHA_SIZE, CHARS_MODES,
+    DIFFICULT_LEVELS_VALUES, NOISE_PIXELS, STARTUP_BUDGET_MS
+)
+from ._encoder import encode_image
+from ._generator import CaptchaGenerator
+from ._random import import_numpy
+from ._threaded import CaptchaThreadPool
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Get the percentile of a list of values (nearest rank, pct 0-100).
+
+    Parameters
+    ----------
+    values : Sequence[float]
+    pct : float
+
+    Returns
+    -------
+    float
+    """
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = int(round((pct / 100) * (len(ordered) - 1)))
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    """Get latency percentiles in milliseconds of a list of seconds values.
+
+    Parameters
+    ----------
+    values : Sequence[float]
+
+    Returns
+    -------
+    Dict[str, float]
+    """
+
+    return {
+        "mean_ms": 1000 * sum(values) / max(len(values), 1),
+        "p50_ms": 1000 * percentile(values, 50),
+        "p90_ms": 1000 * percentile(values, 90),
+        "p99_ms": 1000 * percentile(values, 99),
+        "max_ms": 1000 * max(values, default=0.0)
+    }
+
+
+class StageRecorder:
+    def __init__(self) -> None:
+        """Metrics sink that keeps all the stages durations."""
+
+        self.stages: Dict[str, List[float]] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.stages.setdefault(stage, []).append(seconds)
+
+
+def bench_config(generator: CaptchaGenerator, math: bool,
+                 captcha_kwargs: Dict[str, Any], iterations: int,
+                 image_format: Optional[str] = "png") -> Dict[str, Any]:
+    """Measure the generation (and encoding) of captchas of a configuration,
+    with the latencies of each generator stage.
+
+    Parameters
+    ----------
+    generator : CaptchaGenerator
+    math : bool
+    captcha_kwargs : Dict[str, Any]
+    iterations : int
+    image_format : str, optional
+        format to encode the images, by default "png" (None to not encode)
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    stages: Dict[str, List[float]] = {"generate": [], "encode": []}
+    recorder = StageRecorder()
+    generator.metrics = recorder
+    total_start = perf_counter()
+    for _ in range(0, iterations):
+        time_start = perf_counter()
+        if math:
+            captcha = generator.gen_math_captcha_image(**captcha_kwargs)
+        else:
+            captcha = generator.gen_captcha_image(**captcha_kwargs)
+        stages["generate"].append(perf_counter() - time_start)
+        if image_format:
+            time_start = perf_counter()
+            encode_image(captcha.image, image_format)
+            stages["encode"].append(perf_counter() - time_start)
+    total = perf_counter() - total_start
+    generator.metrics = None
+    stages.update(recorder.stages)
+    return {
+        "captchas_per_sec": iterations / total if total > 0 else 0.0,
+        "stages": {
+            name: latency_summary(values)
+            for name, values in stages.items() if values
+        }
+    }
+
+
+def run_benchmark(sizes: Sequence[int], levels: Sequence[int],
+                  chars_modes: Sequence[str], multicolor: Sequence[bool],
+                  noise: Sequence[bool], iterations: int = 10,
+                  warmup: int = 2, math: bool = True,
+                  image_format: Optional[str] = "png",
+                  verbose: bool = False) -> Dict[str, Any]:
+    """Run the benchmark for all the combinations of the given captcha
+    configuration values.
+
+    Parameters
+    ----------
+    sizes : Sequence[int]
+    levels : Sequence[int]
+    chars_modes : Sequence[str]
+    multicolor : Sequence[bool]
+    noise : Sequence[bool]
+    iterations : int, optional
+        by default 10
+    warmup : int, optional
+        not measured captchas generated for each configuration, by default 2
+    math : bool, optional
+        benchmark math captchas too, by default True
+    image_format : str, optional
+        by default "png"
+    verbose : bool, optional
+        print each result, by default False
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    results = []
+    for size_num in sizes:
+        generator = CaptchaGenerator(size_num)
+        configs = []
+        for level, mode, multi, add_noise in product(
+                levels, chars_modes, multicolor, noise):
+            configs.append((False, {
+                "difficult_level": level, "chars_mode": mode,
+                "multicolor": multi,
+                "noise_pixels": NOISE_PIXELS if add_noise else 0
+            }))
+        if math:
+            for level, multi, add_noise in product(levels, multicolor, noise):
+                configs.append((True, {
+                    "difficult_level": level, "multicolor": multi,
+                    "noise_pixels": NOISE_PIXELS if add_noise else 0
+                }))
+        for is_math, kwargs in configs:
+            bench_config(generator, is_math, kwargs, warmup, None)
+            result = bench_config(
+                generator, is_math, kwargs, iterations, image_format
+            )
+            result["config"] = dict(
+                kwargs, captcha_size_num=size_num,
+                captcha_size=list(CAPTCHA_SIZE[size_num]),
+                math=is_math
+            )
+            results.append(result)
+            if verbose:
+                print(json.dumps(result), file=sys.stderr)
+    return {
+        "environment": _environment(),
+        "iterations": iterations,
+        "image_format": image_format,
+        "results": results
+    }
+
+
+def run_thread_scaling(threads: Sequence[int], size_num: int = 2,
+                       iterations: int = 100, warmup: int = 2,
+                       image_format: str = "png", verbose: bool = False,
+                       **captcha_kwargs: Any) -> Dict[str, Any]:
+    """Run the CaptchaThreadPool throughput benchmark for each number of
+    threads (gen_captcha_image() arguments are accepted).
+
+    Parameters
+    ----------
+    threads : Sequence[int]
+    size_num : int, optional
+        by default 2
+    iterations : int, optional
+        captchas generated for each number of threads, by default 100
+    warmup : int, optional
+        not measured captchas generated for each number of threads,
+        by default 2
+    image_format : str, optional
+        by default "png"
+    verbose : bool, optional
+        print each result, by default False
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    results: List[Dict[str, Any]] = []
+    generator = CaptchaGenerator(size_num)
+    for num_threads in threads:
+        with CaptchaThreadPool(threads=num_threads, image_format=image_format,
+                               generator=generator) as pool:
+            for _ in pool.imap_captchas(warmup, **captcha_kwargs):
+                pass
+            time_start = perf_counter()
+            for _ in pool.imap_captchas(iterations, **captcha_kwargs):
+                pass
+            elapsed = perf_counter() - time_start
+        result = {
+            "threads": num_threads,
+            "seconds": elapsed,
+            "throughput": iterations / elapsed if elapsed > 0 else 0.0
+        }
+        if results and (results[0]["throughput"] > 0):
+            result["speedup"] = \
+                result["throughput"] / results[0]["throughput"]
+        else:
+            result["speedup"] = 1.0
+        results.append(result)
+        if verbose:
+            print(json.dumps(result), file=sys.stderr)
+    return {
+        "environment": _environment(),
+        "config": dict(
+            captcha_kwargs, captcha_size_num=size_num,
+            captcha_size=list(CAPTCHA_SIZE[size_num])
+        ),
+        "iterations": iterations,
+        "image_format": image_format,
+        "results": results
+    }
+
+
+def peak_rss() -> Optional[int]:
+    """Get the peak resident memory of the current process, in bytes.
+
+    Returns
+    -------
+    Optional[int]
+        None if it is not supported by the system
+    """
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _memory_worker(size_num: int, buffer_pool: bool, iterations: int,
+                   image_format: str,
+                   captcha_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate captchas in a fresh process and get its memory usage.
+
+    Parameters
+    ----------
+    size_num : int
+    buffer_pool : bool
+    iterations : int
+    image_format : str
+    captcha_kwargs : Dict[str, Any]
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    generator = CaptchaGenerator(size_num)
+    # A pool that keeps no images just counts the allocations
+    pool = BufferPool(BUFFER_POOL_MAX_IMAGES if buffer_pool else 0)
+    generator.buffer_pool = pool
+    start_rss = peak_rss()
+    time_start = perf_counter()
+    for _ in range(0, iterations):
+        generator.gen_captcha_bytes(image_format, **captcha_kwargs)
+    elapsed = perf_counter() - time_start
+    return {
+        "buffer_pool": buffer_pool,
+        "startup_peak_rss_bytes": start_rss,
+        "peak_rss_bytes": peak_rss(),
+        "images_per_captcha": (pool.allocations + pool.reuses) / iterations,
+        "allocations_per_captcha": pool.allocations / iterations,
+        "throughput": iterations / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def run_memory_benchmark(sizes: Sequence[int], iterations: int = 50,
+                         image_format: str = "png", verbose: bool = False,
+                         **captcha_kwargs: Any) -> Dict[str, Any]:
+    """Run the memory benchmark for each captcha size, with and without
+    buffer pool, each one in a new process (gen_captcha_image() arguments
+    are accepted).
+
+    Parameters
+    ----------
+    sizes : Sequence[int]
+    iterations : int, optional
+        captchas generated for each size, by default 50
+    image_format : str, optional
+        by default "png"
+    verbose : bool, optional
+        print each result, by default False
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    results = []
+    context = get_context("spawn")
+    for size_num, buffer_pool in product(sizes, (False, True)):
+        with context.Pool(1) as pool:
+            result = pool.apply(_memory_worker, (
+                size_num, buffer_pool, iterations, image_format,
+                captcha_kwargs
+            ))
+        result["config"] = dict(
+            captcha_kwargs, captcha_size_num=size_num,
+            captcha_size=list(CAPTCHA_SIZE[size_num])
+        )
+        results.append(result)
+        if verbose:
+            print(json.dumps(result), file=sys.stderr)
+    return {
+        "environment": _environment(),
+        "iterations": iterations,
+        "image_format": image_format,
+        "results": results
+    }
+
+
+# Cold start measure run in a new interpreter (argv: package parent
+# directory, captcha size number, image format, gen_captcha_image() JSON
+# arguments), that prints the times of each startup step as JSON
+_STARTUP_SCRIPT = """
+import json, sys
+from time import perf_counter
+time_start = perf_counter()
+sys.path.insert(0, sys.argv[1])
+from multicolorcaptcha import CaptchaGenerator, encode_image
+time_import = perf_counter()
+generator = CaptchaGenerator(int(sys.argv[2]))
+time_generator = perf_counter()
+captcha = generator.gen_captcha_image(**json.loads(sys.argv[4]))
+if sys.argv[3] != "none":
+    encode_image(captcha.image, sys.argv[3])
+time_captcha = perf_counter()
+print(json.dumps({
+    "import_ms": 1000 * (time_import - time_start),
+    "generator_ms": 1000 * (time_generator - time_import),
+    "first_captcha_ms": 1000 * (time_captcha - time_generator),
+    "total_ms": 1000 * (time_captcha - time_start),
+    "numpy_imported": "numpy" in sys.modules
+}))
+"""
+
+
+def run_startup_benchmark(size_num: int = 2, runs: int = 10,
+                          image_format: str = "png",
+                          budget_ms: float = STARTUP_BUDGET_MS,
+                          verbose: bool = False,
+                          **captcha_kwargs: Any) -> Dict[str, Any]:
+    """Run the cold start benchmark: the time to import the library, create
+    a generator and get the first captcha in a new process, measured over
+    several runs and checked against a time budget (gen_captcha_image()
+    arguments are accepted).
+
+    Parameters
+    ----------
+    size_num : int, optional
+        by default 2
+    runs : int, optional
+        new processes started, by default 10
+    image_format : str, optional
+        format to encode the first captcha ("none" to not encode it),
+        by default "png"
+    budget_ms : float, optional
+        max median milliseconds to the first captcha,
+        by default STARTUP_BUDGET_MS
+    verbose : bool, optional
+        print each run result, by default False
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    package_dir = path.dirname(path.dirname(path.abspath(__file__)))
+    steps: Dict[str, List[float]] = {
+        "import_ms": [], "generator_ms": [], "first_captcha_ms": [],
+        "total_ms": [], "process_ms": []
+    }
+    numpy_imported = False
+    for _ in range(0, max(1, runs)):
+        time_start = perf_counter()
+        process = run([
+            sys.executable, "-c", _STARTUP_SCRIPT, package_dir,
+            str(size_num), image_format, json.dumps(captcha_kwargs)
+        ], capture_output=True, check=True, text=True)
+        process_ms = 1000 * (perf_counter() - time_start)
+        result = json.loads(process.stdout)
+        result["process_ms"] = process_ms
+        numpy_imported = numpy_imported or result.pop("numpy_imported")
+        for step, values in steps.items():
+            values.append(result[step])
+        if verbose:
+            print(json.dumps(result), file=sys.stderr)
+    summary = {
+        step: {
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "max": max(values)
+        }
+        for step, values in steps.items()
+    }
+    return {
+        "environment": _environment(),
+        "runs": max(1, runs),
+        "image_format": image_format,
+        "config": dict(
+            captcha_kwargs, captcha_size_num=size_num,
+            captcha_size=list(CAPTCHA_SIZE[size_num])
+        ),
+        "budget_ms": budget_ms,
+        "within_budget": summary["total_ms"]["p50"] <= budget_ms,
+        "numpy_imported": numpy_imported,
+        "steps": summary
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    np = import_numpy()
+    return {
+        "multicolorcaptcha": __version__,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__ if np is not None else None,
+        "platform": platform.platform(),
+        "cpu_count": cpu_count(),
+        "gil_enabled": getattr(sys, "_is_gil_enabled", lambda: True)()
+    }
+
+
+def _bool_list(value: str) -> List[bool]:
+    return [item.strip().lower() in ("1", "true", "on", "yes")
+            for item in value.split(",")]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(
+        prog="python -m multicolorcaptcha.bench",
+        description="Captcha generation benchmark (JSON output)."
+    )
+    parser.add_argument(
+        "--sizes", type=_int_list,
+        default=list(range(0, len(CAPTCHA_SIZE))),
+        help="captcha size numbers (comma separated), default all"
+    )
+    parser.add_argument(
+        "--levels", type=_int_list,
+        default=list(range(0, len(DIFFICULT_LEVELS_VALUES))),
+        help="difficult levels (comma separated), default all"
+    )
+    parser.add_argument(
+        "--modes", type=lambda v: v.split(","), default=list(CHARS_MODES),
+        help="chars modes (comma separated), default all"
+    )
+    parser.add_argument(
+        "--multicolor", type=_bool_list, default=[False, True],
+        help="multicolor values (comma separated), default both"
+    )
+    parser.add_argument(
+        "--noise", type=_bool_list, default=[False, True],
+        help="noise values (comma separated), default both"
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--format", default="png",
+        help="encode format (png, webp, jpeg or none)"
+    )
+    parser.add_argument(
+        "--no-math", action="store_true", help="skip math captchas"
+    )
+    parser.add_argument(
+        "--threads", type=_int_list,
+        help="run the thread pool scaling benchmark for these numbers of "
+             "threads (comma separated) instead, using the first size, "
+             "level and chars mode"
+    )
+    parser.add_argument(
+        "--memory", action="store_true",
+        help="run the memory benchmark (peak RSS and images allocations "
+             "with and without buffer pool) instead, using the first "
+             "level and chars mode"
+    )
+    parser.add_argument(
+        "--startup", action="store_true",
+        help="run the cold start benchmark (import and first captcha "
+             "times in new processes, -n runs) instead, using the first "
+             "size, level and chars mode"
+    )
+    parser.add_argument(
+        "--budget", type=float, default=STARTUP_BUDGET_MS,
+        help="cold start budget in milliseconds, default "
+             f"{STARTUP_BUDGET_MS:g}"
+    )
+    parser.add_argument("-o", "--output", help="JSON output file")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    image_format = None if args.format.lower() == "none" else args.format
+    if args.startup:
+        report = run_startup_benchmark(
+            args.sizes[0], args.iterations, image_format or "none",
+            args.budget, args.verbose, difficult_level=args.levels[0],
+            chars_mode=args.modes[0], multicolor=args.multicolor[0],
+            noise_pixels=NOISE_PIXELS if args.noise[0] else 0
+        )
+    elif args.memory:
+        report = run_memory_benchmark(
+            args.sizes, args.iterations, image_format or "png",
+            args.verbose, difficult_level=args.levels[0],
+            chars_mode=args.modes[0], multicolor=args.multicolor[0],
+            noise_pixels=NOISE_PIXELS if args.noise[0] else 0
+        )
+    elif args.threads:
+        report = run_thread_scaling(
+            args.threads, args.sizes[0], args.iterations, args.warmup,
+            image_format or "png", args.verbose,
+            difficult_level=args.levels[0], chars_mode=args.modes[0],
+            multicolor=args.multicolor[0],
+            noise_pixels=NOISE_PIXELS if args.noise[0] else 0
+        )
+    else:
+        report = run_benchmark(
+            args.sizes, args.levels, args.modes, args.multicolor,
+            args.noise, args.iterations, args.warmup, not args.no_math,
+            image_format, args.verbose
+        )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.startup and not report["within_budget"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
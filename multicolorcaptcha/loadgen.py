@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""Load generator for the captcha HTTP microservice.
+
+Usage: python -m multicolorcaptcha.loadgen [--url URL] [-c 8] [-n 2000]
+
+Each client thread keeps one keep-alive connection and requests a captcha
+(and verifies it with a wrong answer if --verify is set) in a loop. The
+requests throughput and latency percentiles are reported as JSON.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from http.client import HTTPConnection
+from threading import Thread
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .bench import latency_summary
+
+
+def _client(url: str, query: str, num_requests: int, verify: bool,
+            latencies: Dict[str, List[float]], errors: List[str]) -> None:
+    """Run the requests of a client over a single connection.
+
+    Parameters
+    ----------
+    url : str
+    query : str
+    num_requests : int
+    verify : bool
+    latencies : Dict[str, List[float]]
+        where to add the requests latencies of each endpoint
+    errors : List[str]
+        where to add the requests errors
+    """
+
+    target = urlsplit(url)
+    connection = HTTPConnection(target.hostname, target.port or 80, 30)
+    try:
+        for _ in range(0, num_requests):
+            time_start = perf_counter()
+            connection.request("GET", f"/captcha?{query}")
+            response = connection.getresponse()
+            response.read()
+            latencies["captcha"].append(perf_counter() - time_start)
+            if response.status != 200:
+                errors.append(f"captcha: HTTP {response.status}")
+                continue
+            if not verify:
+                continue
+            body = json.dumps({
+                "id": response.getheader("X-Captcha-Id"), "answer": "-"
+            })
+            time_start = perf_counter()
+            connection.request(
+                "POST", "/verify", body,
+                {"Content-Type": "application/json"}
+            )
+            response = connection.getresponse()
+            response.read()
+            latencies["verify"].append(perf_counter() - time_start)
+            if response.status != 200:
+                errors.append(f"verify: HTTP {response.status}")
+    except Exception as error:
+        errors.append(repr(error))
+    finally:
+        connection.close()
+
+
+def run_load(url: str = "http://127.0.0.1:8080", clients: int = 8,
+             num_requests: int = 2000, query: str = "", verify: bool = False
+             ) -> Dict[str, Any]:
+    """Request captchas from a captcha server with concurrent clients.
+
+    Parameters
+    ----------
+    url : str, optional
+        by default "http://127.0.0.1:8080"
+    clients : int, optional
+        concurrent clients (connections), by default 8
+    num_requests : int, optional
+        total captchas requested, by default 2000
+    query : str, optional
+        captcha request query (i.e. "level=3&mode=hex"), by default ""
+    verify : bool, optional
+        verify each captcha too, by default False
+
+    Returns
+    -------
+    Dict[str, Any]
+    """
+
+    clients = max(1, clients)
+    latencies: Dict[str, List[float]] = {"captcha": [], "verify": []}
+    errors: List[str] = []
+    threads = []
+    for num in range(0, clients):
+        client_requests = num_requests // clients
+        if num < num_requests % clients:
+            client_requests += 1
+        threads.append(Thread(
+            target=_client,
+            args=(url, query, client_requests, verify, latencies, errors)
+        ))
+    time_start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - time_start
+    report: Dict[str, Any] = {
+        "url": url,
+        "query": query,
+        "clients": clients,
+        "seconds": elapsed,
+        "captchas_per_second": len(latencies["captcha"]) / elapsed,
+        "captcha": latency_summary(latencies["captcha"]),
+        "errors": len(errors),
+        "first_errors": errors[:5]
+    }
+    if verify:
+        report["verify"] = latency_summary(latencies["verify"])
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(
+        prog="python -m multicolorcaptcha.loadgen",
+        description="Captcha server load generator (JSON output)."
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("-c", "--clients", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument(
+        "--query", default="",
+        help="captcha request query, i.e. \"level=3&mode=hex\""
+    )
+    parser.add_argument(
+        "--verify", action="store_true", help="verify each captcha too"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        args.url, args.clients, args.requests, args.query, args.verify
+    )
+    print(json.dumps(report, indent=2))
+    return 0 if not report["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+"""Captcha HTTP microservice.
+
+Usage: python -m multicolorcaptcha.serve [--host HOST] [--port PORT] [options]
+
+Endpoints:
+    GET /captcha?level=2&mode=nums&multicolor=0
+    GET /captcha?math=1&level=0&multiplication=0
+        Encoded captcha image, with its ID in the X-Captcha-Id header.
+    POST /verify (JSON or form body: id, answer)
+        {"valid": true|false}, each captcha ID can be verified just once.
+    GET /health
+        Reservoir and verifier counters.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ._constants import (
+    CHARS_MODES, DIFFICULT_LEVELS_VALUES, SERVE_MAX_BODY, VERIFIER_TTL
+)
+from ._pool import CaptchaPool
+from ._reservoir import CaptchaReservoir
+from ._verifier import CaptchaVerifier
+
+
+# Content type of each image format
+CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg"
+}
+
+
+class CaptchaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int],
+                 reservoir: CaptchaReservoir, verifier: CaptchaVerifier,
+                 image_format: str = "png", ignore_case: bool = True,
+                 verbose: bool = False) -> None:
+        """HTTP server of captchas taken from a reservoir of pre-generated
+        encoded captchas, with their answers kept in a verifier.
+
+        Parameters
+        ----------
+        address : Tuple[str, int]
+            (host, port)
+        reservoir : CaptchaReservoir
+            reservoir of encoded captchas (that uses a CaptchaPool)
+        verifier : CaptchaVerifier
+        image_format : str, optional
+            format of the reservoir captchas, by default "png"
+        ignore_case : bool, optional
+            verify "hex" and "ascii" captchas answers ignoring the case,
+            by default True
+        verbose : bool, optional
+            log each request, by default False
+        """
+
+        self.reservoir = reservoir
+        self.verifier = verifier
+        self.content_type = CONTENT_TYPES.get(
+            image_format.lower(), "application/octet-stream"
+        )
+        self.ignore_case = ignore_case
+        self.verbose = verbose
+        super().__init__(address, CaptchaRequestHandler)
+
+    def issue_captcha(self, query: Dict[str, List[str]]
+                      ) -> Tuple[str, Any]:
+        """Take a captcha of the requested configuration and register its
+        answer.
+
+        Parameters
+        ----------
+        query : Dict[str, List[str]]
+            request query arguments
+
+        Returns
+        -------
+        Tuple[str, Any]
+            (captcha ID, EncodedCaptchaModel or EncodedMathsCaptchaModel)
+        """
+
+        level = int(_query_value(query, "level", "2"))
+        level = min(max(level, 0), len(DIFFICULT_LEVELS_VALUES) - 1)
+        multicolor = _query_bool(query, "multicolor")
+        if _query_bool(query, "math"):
+            captcha = self.reservoir.get_math_captcha(
+                difficult_level=level, multicolor=multicolor,
+                allow_multiplication=_query_bool(query, "multiplication")
+            )
+            return (self.verifier.add(captcha), captcha)
+        mode = _query_value(query, "mode", "nums")
+        if mode not in CHARS_MODES:
+            raise ValueError(f"Unknown chars mode: {mode}")
+        captcha = self.reservoir.get_captcha(
+            difficult_level=level, chars_mode=mode, multicolor=multicolor
+        )
+        case_sensitive = (mode == "nums") or (not self.ignore_case)
+        return (self.verifier.add(captcha, case_sensitive=case_sensitive),
+                captcha)
+
+    def server_close(self) -> None:
+        """Close the server socket, the reservoir and its pool."""
+
+        super().server_close()
+        self.reservoir.close()
+        if self.reservoir.pool is not None:
+            self.reservoir.pool.close()
+
+
+class CaptchaRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, without the Nagle algorithm delaying the
+    # response body sent after its headers
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: CaptchaServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/captcha":
+            try:
+                captcha_id, captcha = self.server.issue_captcha(
+                    parse_qs(url.query)
+                )
+            except ValueError as error:
+                self.send_json(400, {"error": str(error)})
+                return
+            self.send_body(
+                200, captcha.data, self.server.content_type,
+                {"X-Captcha-Id": captcha_id}
+            )
+        elif url.path == "/health":
+            self.send_json(200, {
+                "reservoir": self.server.reservoir.stats(),
+                "outstanding": len(self.server.verifier),
+                "verified": self.server.verifier.verified,
+                "failed": self.server.verifier.failed,
+                "expired": self.server.verifier.expired
+            })
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/verify":
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(400, {"error": "Invalid Content-Length"})
+            return
+        if length > SERVE_MAX_BODY:
+            self.close_connection = True
+            self.send_json(413, {"error": "Request body too large"})
+            return
+        body = self.rfile.read(length).decode("utf-8", "replace")
+        try:
+            if "json" in (self.headers.get("Content-Type") or ""):
+                args = json.loads(body)
+            else:
+                args = {k: v[0] for k, v in parse_qs(body).items()}
+            captcha_id = str(args["id"])
+            answer = str(args["answer"])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.send_json(400, {"error": "Expected id and answer"})
+            return
+        self.send_json(
+            200, {"valid": self.server.verifier.verify(captcha_id, answer)}
+        )
+
+    def send_json(self, status: int, data: Dict[str, Any]) -> None:
+        self.send_body(
+            status, json.dumps(data).encode(), "application/json"
+        )
+
+    def send_body(self, status: int, body: Any, content_type: str,
+                  headers: Optional[Dict[str, str]] = None) -> None:
+        """Send a full response (with Content-Length, so the connection is
+        kept alive).
+
+        Parameters
+        ----------
+        status : int
+        body : bytes-like
+        content_type : str
+        headers : Dict[str, str], optional
+            extra headers, by default None
+        """
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _query_value(query: Dict[str, List[str]], name: str,
+                 default: str) -> str:
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _query_bool(query: Dict[str, List[str]], name: str) -> bool:
+    return _query_value(query, name, "0").lower() in ("1", "true", "yes")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8080,
+                captcha_size_num: int = 2, processes: Optional[int] = None,
+                reservoir_size: int = 256, image_format: str = "png",
+                ttl: float = VERIFIER_TTL, ignore_case: bool = True,
+                verbose: bool = False) -> CaptchaServer:
+    """Create a captcha server, with warmed worker processes refilling the
+    captchas reservoir.
+
+    Parameters
+    ----------
+    host : str, optional
+        by default "127.0.0.1"
+    port : int, optional
+        by default 8080
+    captcha_size_num : int, optional
+        by default 2
+    processes : int, optional
+        generation worker processes, by default the number of CPUs
+    reservoir_size : int, optional
+        captchas kept ready for each configuration, by default 256
+    image_format : str, optional
+        by default "png"
+    ttl : float, optional
+        seconds to expire a not verified captcha, by default VERIFIER_TTL
+    ignore_case : bool, optional
+        verify "hex" and "ascii" captchas answers ignoring the case,
+        by default True
+    verbose : bool, optional
+        log each request, by default False
+
+    Returns
+    -------
+    CaptchaServer
+    """
+
+    pool = CaptchaPool(
+        captcha_size_num, processes, image_format, preload_fonts=True
+    )
+    reservoir = CaptchaReservoir(
+        target_size=reservoir_size, refill_threads=pool.processes,
+        pool=pool
+    )
+    # Start filling the default captcha configuration
+    reservoir.add_config(
+        difficult_level=2, chars_mode="nums", multicolor=False
+    )
+    verifier = CaptchaVerifier(ttl)
+    try:
+        return CaptchaServer(
+            (host, port), reservoir, verifier, image_format, ignore_case,
+            verbose
+        )
+    except Exception:
+        reservoir.close()
+        pool.close()
+        raise
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(
+        prog="python -m multicolorcaptcha.serve",
+        description="Captcha HTTP microservice."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--size", type=int, default=2,
+                        help="captcha size number, default 2")
+    parser.add_argument("--processes", type=int,
+                        help="worker processes, default number of CPUs")
+    parser.add_argument("--reservoir", type=int, default=256,
+                        help="captchas kept ready per configuration")
+    parser.add_argument("--format", default="png",
+                        help="image format (png, webp or jpeg)")
+    parser.add_argument("--ttl", type=float, default=VERIFIER_TTL,
+                        help="seconds to expire a captcha")
+    parser.add_argument("--case-sensitive", action="store_true",
+                        help="verify hex and ascii answers with case")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = make_server(
+        args.host, args.port, args.size, args.processes, args.reservoir,
+        args.format, args.ttl, not args.case_sensitive, args.verbose
+    )
+    print(f"Serving captchas on http://{args.host}:{args.port}",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,6 +41,9 @@ setup(
     install_requires=[
         "Pillow",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     setup_requires=[
         "pytest-runner",
     ],